@@ -6,6 +6,8 @@ import shutil
 
 sys.path.append("..")
 import utils
+from utils.history import RunHistory
+from utils.reports import ReportStore
 engines = utils.ENGINES
 API_URL: str = "https://www.ebi.ac.uk/biomodels"
 
@@ -16,6 +18,7 @@ suppress_stdout = True
 suppress_stderr = True
 fix_broken_ref = True
 skip = {}
+force_resubmit = False #True to submit every archive to biosimulations again instead of reusing recorded runs
 
 def download_file(model_id,filename,output_file,cache):
     '''
@@ -97,6 +100,12 @@ def main():
 
     #mode="off" to disable caching, "store" to wipe and store fresh results, "reuse" to use the stored cache
     cache = utils.RequestCache(mode="store",direc="cache")
+    #reuse local engine runs when neither the omex archive nor the engine image changed
+    local_cache = utils.LocalResultCache(mode="auto")
+    #reuse remote runs of the same omex archive, engine and simulator version
+    ledger = utils.SubmissionLedger(mode="store" if force_resubmit else "auto")
+    #append every engine outcome to the run history, see "python -m utils.history"
+    history = RunHistory(label="BioModels")
     count = 0
     starting_dir = os.getcwd()
 
@@ -157,7 +166,11 @@ def main():
                                  os.path.basename(sbml_file_path),
                                  os.path.join(test_folder,'d1_plots_remote'), 
                                  os.path.join(test_folder,'d1_plots_local'),
-                                 test_folder=test_folder)
+                                 test_folder=test_folder,
+                                 local_cache=local_cache,
+                                 ledger=ledger,
+                                 history=history,
+                                 reports=ReportStore())
         
         shutil.rmtree(tmp_model_dir) 
 
@@ -1,12 +1,18 @@
 #!/usr/bin/env python
-"""Test health status of the BioSimulators API."""
+"""Test health status of the BioSimulators API.
+
+An optional argument gives another API base URL, eg a local utils.fake_biosimulations server:
+    python test_biosimulators_api.py http://localhost:8000
+"""
 
 import requests 
 import sys
 
-biosimulations_api_url = "https://api.biosimulations.org/health"
+biosimulations_api_url = "https://api.biosimulations.org"
+if len(sys.argv) > 1:
+    biosimulations_api_url = sys.argv[1].rstrip('/')
 
-r = requests.get(biosimulations_api_url)  
+r = requests.get(f"{biosimulations_api_url}/health")  
 r_status = r.json()["status"]
 
 if r_status == "ok":
@@ -14,4 +20,4 @@ if r_status == "ok":
 else:
     exit_status = 1
 
-sys.exit(exit_status)
\ No newline at end of file
+sys.exit(exit_status)
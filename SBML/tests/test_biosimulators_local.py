@@ -10,7 +10,6 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))) # to import utils
 import utils
 import argparse
-import json
 
 # Save the current working directory
 cwd = os.getcwd()
@@ -30,8 +29,14 @@ sedml_file_name = 'LEMS_NML2_Ex9_FN_missing_xmlns.sedml' #xmlns:sbml missing
 # output_dir is set to 'd1_plots' by default but can be changed using the --output-dir argument (required to deal with GitHub Actions permission issues)
 parser = argparse.ArgumentParser(description='Test compatibility of different biosimulation engines')
 parser.add_argument('--output-dir',action='store',default='d1_plots',help='prefix of the output directory where the d1 plots will be saved')
+parser.add_argument('--cache',action='store',default='off',choices=['off','store','auto'],help='local result cache mode, "auto" restores unchanged (engine image, omex) runs instead of rerunning them')
+parser.add_argument('--backend',action='store',default=None,choices=list(utils.EXECUTORS.keys()),help='run every engine with this backend instead of the backend set in utils.ENGINES, eg "docker-warm"')
+parser.add_argument('--pinned-images',action='store',default=None,help='JSON file written by "python -m utils.prepare_engines", runs the engines with the image digests recorded in it')
 args = parser.parse_args()
 
+if args.pinned_images:
+    utils.pin_engine_images(os.path.join(cwd, args.pinned_images))
+
 test_folder = 'tests'
 
 d1_plots_local_dir = os.path.join(test_folder, args.output_dir + '_local')
@@ -44,9 +49,10 @@ results_local = utils.run_biosimulators_locally(engine_keys,
                                     sedml_file_name=sedml_file_name, 
                                     sbml_file_name=sbml_file_name,
                                     d1_plots_local_dir=d1_plots_local_dir, 
-                                    test_folder=test_folder)
+                                    test_folder=test_folder,
+                                    cache=utils.LocalResultCache(mode=args.cache),
+                                    backend=args.backend)
     
 results_local_path = os.path.join(path_to_sbml_folder, 'tests', 'results_local.json')
-with open(results_local_path, 'w') as fp:
-    json.dump(results_local, fp, indent=4)
+utils.save_results(results_local, results_local_path)
     
\ No newline at end of file
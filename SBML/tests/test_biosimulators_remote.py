@@ -11,7 +11,6 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))) # to import utils
 import utils
 import argparse
-import json
 
 
 # Save the current working directory
@@ -32,8 +31,19 @@ sedml_file_name = 'LEMS_NML2_Ex9_FN_missing_xmlns.sedml' #xmlns:sbml missing
 # output_dir is set to 'd1_plots' by default but can be changed using the --output-dir argument (required to deal with GitHub Actions permission issues)
 parser = argparse.ArgumentParser(description='Test compatibility of different biosimulation engines')
 parser.add_argument('--output-dir',action='store',default='d1_plots',help='prefix of the output directory where the d1 plots will be saved')
+parser.add_argument('--pinned-versions',action='store',default=None,help='JSON file of engine to simulator version, runs the engines with these versions instead of the latest ones')
+parser.add_argument('--save-versions',action='store',default=None,help='write the simulator versions used to this JSON file, for use with --pinned-versions')
+parser.add_argument('--api-url',action='store',default=None,help='BioSimulations API base URL to submit to instead of api.biosimulations.org, eg a local "python -m utils.fake_biosimulations" server')
+parser.add_argument('--force-resubmit',action='store_true',help='submit the archive again instead of reusing runs recorded in the submission ledger')
+parser.add_argument('--download-archive',action='store',default='auto',choices=['auto','always'],help='"auto" only downloads the results archives of successful runs, the other logs come from the logs endpoint')
 args = parser.parse_args()
 
+if args.api_url:
+    utils.set_biosimulations_api_url(args.api_url)
+
+if args.pinned_versions:
+    utils.pin_simulator_versions(os.path.join(cwd, args.pinned_versions))
+
 test_folder = 'tests'
 
 d1_plots_remote_dir = os.path.join(test_folder, args.output_dir + '_remote')
@@ -45,9 +55,12 @@ engine_keys = list(utils.ENGINES.keys())
 results_remote = utils.run_biosimulators_remotely(engine_keys, sedml_file_name=sedml_file_name, 
                                     sbml_file_name=sbml_file_name,
                                     d1_plots_remote_dir=d1_plots_remote_dir, 
-                                    test_folder=test_folder)
+                                    test_folder=test_folder,
+                                    ledger=utils.SubmissionLedger(mode="store" if args.force_resubmit else "auto"),
+                                    download_archive=args.download_archive)
 
 results_remote_path = os.path.join(path_to_sbml_folder, 'tests', 'results_remote.json')
-with open(results_remote_path, 'w') as fp:
-    json.dump(results_remote, fp, indent=4)
-    
\ No newline at end of file
+utils.save_results(results_remote, results_remote_path)
+    
+if args.save_versions:
+    utils.save_simulator_versions(engine_keys, os.path.join(cwd, args.save_versions))
@@ -10,6 +10,8 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))) # to import utils
 import utils
+from utils.history import RunHistory
+from utils.reports import ReportStore
 import argparse
 
 # Save the current working directory
@@ -46,4 +48,6 @@ utils.run_biosimulators_remotely_and_locally(engine_keys,
                                  sbml_file_name,
                                  d1_plots_remote_dir, 
                                  d1_plots_local_dir,
-                                 test_folder=test_folder)
\ No newline at end of file
+                                 test_folder=test_folder,
+                                 history=RunHistory(label="SBML"),
+                                 reports=ReportStore())
\ No newline at end of file
@@ -2,8 +2,8 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))) # to import utils
 import utils
+from utils.reports import ReportStore
 import argparse
-import json
 
 # Save the current working directory
 cwd = os.getcwd()
@@ -23,6 +23,10 @@ sedml_file_name = 'LEMS_NML2_Ex9_FN_missing_xmlns.sedml' #xmlns:sbml missing
 # output_dir is set to 'd1_plots' by default but can be changed using the --output-dir argument (required to deal with GitHub Actions permission issues)
 parser = argparse.ArgumentParser(description='Test compatibility of different biosimulation engines')
 parser.add_argument('--output-dir',action='store',default='d1_plots',help='prefix of the output directory where the d1 plots will be saved')
+parser.add_argument('--telemetry',action='store_true',help='add the wall time, CPU time and peak memory of the local runs to the table')
+parser.add_argument('--page-size',action='store',type=int,default=None,help='split the table into pages of this many engines grouped by local outcome, linked from the results file')
+parser.add_argument('--agreement',action='store_true',help='add the agreement of the engines\' reports, from tests/reports.npz written by test_compatibility_biosimulators.py')
+parser.add_argument('--reference',action='store',default=None,help='engine the reports are compared with for --agreement, defaults to the consensus of all the engines')
 args = parser.parse_args()
 
 test_folder = 'tests'
@@ -37,8 +41,11 @@ results_paths = {
 
 results = {}
 for key, path in results_paths.items():
-    with open(path, 'r') as f:
-        results[key] = json.load(f)
+    results[key] = utils.load_results(path)
+
+agreement = None
+if args.agreement:
+    agreement = ReportStore.load(os.path.join(path_to_sbml_folder, 'tests', 'reports.npz'), reference=args.reference).agreement_cells()
 
 results_table = utils.create_combined_results_table(results["remote"], 
                                   results["local"], 
@@ -46,7 +53,11 @@ results_table = utils.create_combined_results_table(results["remote"],
                                   sbml_file_name, 
                                   d1_plots_local_dir, 
                                   d1_plots_remote_dir,
-                                  test_folder='tests')
+                                  test_folder='tests',
+                                  telemetry=args.telemetry,
+                                  page_size=args.page_size,
+                                  group_by=f"{utils.PASS_FAIL} (L)" if args.page_size else None,
+                                  agreement=agreement)
 
 print(results_table)
     
\ No newline at end of file
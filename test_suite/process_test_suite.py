@@ -86,6 +86,14 @@ def parse_arguments():
         help="Path to file results will be written to, any parent directories must exist, eg ./results.md",
     )
 
+    parser.add_argument(
+        "--page-size",
+        action="store",
+        type=int,
+        default=0,
+        help="Split the table into pages of this many cases grouped by tellurium outcome, the output file becomes a summary page linking to them, 0 means one page",
+    )
+
     return parser.parse_args()
 
 
@@ -112,7 +120,22 @@ def process_cases(args):
     # set up the markdown table 
     column_labels = "case|valid-sbml|valid-sbml-units|valid-sedml|tellurium|xmlns-sbml-missing"
     column_keys  =  "case|valid_sbml|valid_sbml_units|valid_sedml|tellurium_outcome|xmlns_sbml_missing"
-    mtab = utils.MarkdownTable(column_labels, column_keys)  
+    # rows are written to the output file as each case finishes, with running summary counts
+    mtab = utils.StreamingMarkdownTable(column_labels, column_keys, os.path.abspath(args.output_file), preface=md_description,
+                                        page_size=args.page_size or None, group_by='tellurium_outcome')
+
+    #give failure counts
+    for key in ['valid_sbml','valid_sbml_units','valid_sedml']:
+        mtab.count(key,lambda x:x==False,'n_fail={count}')
+        mtab.transform(key,lambda x:'pass' if x else 'FAIL')
+
+    # add counts for cases and missing xmlns_sbml attributes
+    mtab.count('case',lambda _:True,'n={count}')
+    mtab.count('xmlns_sbml_missing',lambda x:x==True,'n={count}')
+
+    #process engine outcomes column(s)
+    mtab.count_values('tellurium_outcome')
+    mtab.transform('tellurium_outcome')
 
     # set the path to the test suite
     starting_dir = os.getcwd() # where results will be written
@@ -162,24 +185,9 @@ def process_cases(args):
         mtab['xmlns_sbml_missing'] = utils.xmlns_sbml_attribute_missing(sedml_file_path)
         matplotlib.pyplot.close('all')   # supresses error from building up plots  
 
-    #give failure counts
-    for key in ['valid_sbml','valid_sbml_units','valid_sedml']:
-        mtab.add_count(key,lambda x:x==False,'n_fail={count}')
-        mtab.transform_column(key,lambda x:'pass' if x else 'FAIL')
-
-    # add counts for cases and missing xmlns_sbml attributes
-    mtab.add_count('case',lambda _:True,'n={count}')
-    mtab.add_count('xmlns_sbml_missing',lambda x:x==True,'n={count}')
-
-    #process engine outcomes column(s)
-    mtab.simple_summary('tellurium_outcome')
-    mtab.transform_column('tellurium_outcome')
-
-    #write out to file
+    #write out the last row and the summary counts
     os.chdir(starting_dir)
-    with open(args.output_file, "w") as fout:
-        fout.write(md_description)
-        mtab.write(fout)
+    mtab.close()
 
 if __name__ == "__main__":
     args = parse_arguments()
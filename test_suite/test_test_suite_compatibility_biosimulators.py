@@ -15,6 +15,8 @@ import sys
 import shutil
 sys.path.append("..")
 import utils
+from utils.history import RunHistory
+from utils.reports import ReportStore
 engines = utils.ENGINES
 
 
@@ -77,6 +79,12 @@ def parse_arguments():
         help="Base of the URL-to-suite-test-cases link to embed in results, use '' empty string to disable links",
     )
 
+    parser.add_argument(
+        "--force-resubmit",
+        action="store_true",
+        help="Submit every archive to BioSimulations again instead of reusing runs recorded in the submission ledger",
+    )
+
     return parser.parse_args()
 
 def process_cases(args):
@@ -101,6 +109,9 @@ def process_cases(args):
     """
 
     starting_dir = os.getcwd() # where results will be written
+    local_cache = utils.LocalResultCache(mode="auto") # reuse unchanged local engine runs
+    ledger = utils.SubmissionLedger(mode="store" if args.force_resubmit else "auto") # reuse earlier remote runs
+    history = RunHistory(label="test_suite") # append every outcome to the run history
 
     os.chdir(args.suite_path) # change to test suite directory
     suite_path_abs = os.getcwd() # absolute path to test suite
@@ -155,7 +166,11 @@ def process_cases(args):
                                  os.path.basename(sbml_file_path),
                                  os.path.join(test_folder,'d1_plots_remote'), 
                                  os.path.join(test_folder,'d1_plots_local'),
-                                 test_folder=test_folder)
+                                 test_folder=test_folder,
+                                 local_cache=local_cache,
+                                 ledger=ledger,
+                                 history=history,
+                                 reports=ReportStore())
 
 
 if __name__ == "__main__":
@@ -20,137 +20,283 @@ from pyneuroml import biosimulations
 import pandas as pd
 from requests.exceptions import HTTPError 
 import json
-
+import fnmatch
+import importlib
+import subprocess
+import tempfile
+import zipfile
+import importlib.metadata
+import threading
+import atexit
+import concurrent.futures
+import time
+import resource
+import asyncio
+import math
+import gzip
+import shlex
+
+# 'backend' selects how the engine is run locally, see EXECUTORS:
+#   "docker": the ghcr.io/biosimulators/{engine} image (works for every engine)
+#   "docker-warm": the same image, but archives run in one long-lived container per engine
+#   "subprocess": the installed biosimulators-{engine} command line tool
+#   "in-process": the installed biosimulators_{engine} python package, called directly
+# the last two avoid container start up costs but only suit python based engines
+# (eg tellurium, copasi, amici, pysces, cobrapy) whose biosimulators package is installed
 ENGINES = {
     'amici': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_AMICI/',
         'status': "",
-        'name': "AMICI"
+        'name': "AMICI",
+        'backend': 'docker'
     },
     'brian2': {
         'formats': [('nml', 'sedml'), ('lems', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_pyNeuroML/',
         'status': "",
-        'name': "Brian 2"
+        'name': "Brian 2",
+        'backend': 'docker'
     },
     'bionetgen': {
         'formats': [('bngl', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_BioNetGen/',
         'status': "",
-        'name': "BioNetGen"
+        'name': "BioNetGen",
+        'backend': 'docker'
     },
     'boolnet': {
         'formats': [('sbmlqual', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_BoolNet/',
         'status': "",
-        'name': "BoolNet"
+        'name': "BoolNet",
+        'backend': 'docker'
     },
     'cbmpy': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_CBMPy/',
         'status': "",
-        'name': "CBMPy"
+        'name': "CBMPy",
+        'backend': 'docker'
     },
     'cobrapy': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_COBRApy/',
         'status': "Only allows steady state simulations",
-        'name': "COBRApy"
+        'name': "COBRApy",
+        'backend': 'docker'
     },
     'copasi': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_COPASI/',
         'status': "",
-        'name': "COPASI"
+        'name': "COPASI",
+        'backend': 'docker'
     },
     'gillespy2': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_GillesPy2/',
         'status': "",
-        'name': "GillesPy2"
+        'name': "GillesPy2",
+        'backend': 'docker'
     },
     'ginsim': {
         'formats': [('sbmlqual', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_GINsim/',
         'status': "",
-        'name': "GINsim"
+        'name': "GINsim",
+        'backend': 'docker'
     },
     'libsbmlsim': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_LibSBMLSim/',
         'status': "",
-        'name': "LibSBMLSim"
+        'name': "LibSBMLSim",
+        'backend': 'docker'
     },
     'masspy': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_MASSpy/',
         'status': "",
-        'name': "MASSpy"
+        'name': "MASSpy",
+        'backend': 'docker'
     },
     'netpyne': {
         'formats': [('nml', 'sedml'), ('lems', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_pyNeuroML/',
         'status': "",
-        'name': "NetPyNE"
+        'name': "NetPyNE",
+        'backend': 'docker'
     },
     'neuron': {
         'formats': [('nml', 'sedml'), ('lems', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_pyNeuroML/',
         'status': "",
-        'name': "NEURON"
+        'name': "NEURON",
+        'backend': 'docker'
     },
     'opencor': {
         'formats': [('cellml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_OpenCOR/',
         'status': "",
-        'name': "OpenCOR"
+        'name': "OpenCOR",
+        'backend': 'docker'
     },
     'pyneuroml': {
         'formats': [('nml', 'sedml'), ('lems', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_pyNeuroML/',
         'status': "",
-        'name': "pyNeuroML"
+        'name': "pyNeuroML",
+        'backend': 'docker'
     },
     'pysces': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_PySCeS/',
         'status': "",
-        'name': "PySCeS"
+        'name': "PySCeS",
+        'backend': 'docker'
     },
     'rbapy': {
         'formats': [('rbapy', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_RBApy/',
         'status': "",
-        'name': "RBApy"
+        'name': "RBApy",
+        'backend': 'docker'
     },
     'smoldyn': {
         'formats': [('smoldyn', 'sedml')],
         'url': 'https://smoldyn.readthedocs.io/en/latest/python/api.html#sed-ml-combine-biosimulators-api',
         'status': "",
-        'name': "Smoldyn"
+        'name': "Smoldyn",
+        'backend': 'docker'
     },
     'tellurium': {
         'formats': [('sbml', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_tellurium/',
         'status': "",
-        'name': "Tellurium"
+        'name': "Tellurium",
+        'backend': 'docker'
     },
     'vcell': {
         'formats': [('sbml', 'sedml'),('bngl', 'sedml')],
         'url': 'https://github.com/virtualcell/vcell',
         'status': "",
-        'name': "VCell"
+        'name': "VCell",
+        'backend': 'docker'
     },
     'xpp': {
         'formats': [('xpp', 'sedml')],
         'url': 'https://docs.biosimulators.org/Biosimulators_XPP/',
         'status': "",
-        'name': "XPP"
+        'name': "XPP",
+        'backend': 'docker'
     }
 }
 
 
+# resource limits applied to every local biosimulators docker container
+# override them for a single engine with a 'limits' entry in ENGINES, eg 'limits': {'mem_limit': '16g'}
+# mem_limit: docker memory limit string, cpus: number of CPUs (converted to a CPU quota), timeout: wall-clock seconds
+# scratch_size: size of the tmpfs the engine writes its outputs to (counts towards mem_limit)
+DOCKER_LIMITS = {
+    'mem_limit': '8g',
+    'cpus': 2,
+    'timeout': 1200,
+    'scratch_size': '2g',
+}
+
+# time (in seconds) a timed-out container is given to stop before it is killed
+DOCKER_STOP_TIMEOUT = 10
+
+# engine outputs copied from the scratch folder to the output folder
+# (log.yml, vcell's detailedErrorLog.txt, reports and plots), everything else is discarded
+KEPT_OUTPUTS = ['log.yml', 'detailedErrorLog.txt', '*.h5', '*.csv', '*.pdf']
+
+# shell wrapper run inside the container: runs the engine ("$@") with its outputs on the tmpfs scratch folder {scratch}
+# then copies only the kept outputs into the bind mounted output folder {out}, preserving the engine's exit status
+DOCKER_WRAPPER = '''"$@"; status=$?
+cd {scratch} 2>/dev/null && find . -type f \\( {patterns} \\) | while read -r f; do
+    mkdir -p "{out}/$(dirname "$f")" && cp "$f" "{out}/$f"
+done
+cd / && rm -rf {scratch}
+exit $status'''
+
+# warm pool containers idle with this command between jobs, see EngineContainerPool
+DOCKER_IDLE_COMMAND = 'trap "exit 0" TERM; while :; do sleep 3600 & wait $!; done'
+
+# number of jobs a warm pool container runs before it is replaced by a fresh one
+DOCKER_POOL_MAX_JOBS = 50
+
+# seconds between container resource samples, see ContainerStatsSampler
+TELEMETRY_INTERVAL = 0.5
+
+# remote run status polling, the interval grows by REMOTE_POLL_BACKOFF after each check
+REMOTE_POLL_INTERVAL = 2
+REMOTE_POLL_MAX_INTERVAL = 30
+REMOTE_POLL_BACKOFF = 2
+REMOTE_MAX_WAIT_TIME = 600
+# minimum seconds between any two requests to the biosimulations api, shared by all engines
+REMOTE_MIN_REQUEST_INTERVAL = 0.2
+
+# files extracted from remote result archives, with REMOTE_REPORT_OUTPUTS added when reports are requested
+REMOTE_KEPT_OUTPUTS = ['log.yml', '*.pdf']
+REMOTE_REPORT_OUTPUTS = ['*.h5', '*.csv']
+# result archives up to this size are held in memory while extracting, larger ones spill to a temp file
+REMOTE_SPOOL_MAX_SIZE = 32 * 1024**2
+DOWNLOAD_CHUNK_SIZE = 1024**2
+DOWNLOAD_MAX_ATTEMPTS = 5
+# seconds before retrying an interrupted or failed download, doubled after each failed attempt
+DOWNLOAD_RETRY_WAIT = 1
+
+# resources requested for remote runs, see size_remote_resources
+# memory in GB and maxTime in minutes, as expected by the biosimulations api
+# the defaults are used by submissions that are not sized, eg submit_omex_remote without resources
+REMOTE_RESOURCES = {'cpus': 1, 'memory': 8, 'maxTime': 20}
+REMOTE_RESOURCE_LIMITS = {'cpus': (1, 4), 'memory': (1, 16), 'maxTime': (5, 120)}
+# (model size, time course points, cpus, memory, maxTime) tiers used when there is no run history
+# model size is the number of species, reactions, events and rules
+# the last tier covers every larger model, only these get more than one cpu
+REMOTE_SIZE_TIERS = [
+    (100, 10000, 1, 2, 10),
+    (1000, 100000, 1, 4, 20),
+    (math.inf, math.inf, 2, 8, 20),
+]
+# margin applied to the largest runtime and memory seen in earlier runs
+REMOTE_HISTORY_MARGIN = 3
+
+# rows per page when a results table is split into pages, see write_markdown_pages
+REPORT_PAGE_SIZE = 250
+
+# log_yml "output" texts longer than this are moved out of the results json files
+# into gzipped files named by their sha256 in LOG_OUTPUT_DIR, see save_results
+LOG_OUTPUT_MAX_INLINE = 4096
+LOG_OUTPUT_DIR = 'log_outputs'
+
+# libyaml's loader when pyyaml was built with it, several times quicker than the pure python one
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# d1 plots are stored once per test folder in PLOT_STORE_DIR, named by the sha256 of their content,
+# with a manifest of the plot names of each run's plot folder (eg d1_plots_local), see move_d1_files
+PLOT_STORE_DIR = 'plots'
+PLOT_MANIFEST = 'manifest.json'
+# pdf metadata left out of the hash, so plots only differing by when they were made are stored once
+PLOT_VOLATILE_METADATA = re.compile(rb'/(CreationDate|ModDate) *\([^)]*\)')
+# png previews shown in the results tables, rendered with PyMuPDF or poppler's pdftoppm if either is installed
+PLOT_PREVIEW_WIDTH = 240
+PLOT_PREVIEW_WORKERS = 4
+
+# image references pinned to a digest (eg ghcr.io/biosimulators/tellurium@sha256:...) by pin_engine_images
+# engines without a pin use the latest ghcr.io/biosimulators/{engine} image
+PINNED_IMAGES = {}
+
+# simulator versions used for remote runs, pinned by pin_simulator_versions
+# engines without a pin use the latest version listed by biosimulators
+PINNED_VERSIONS = {}
+
+# seconds before the on-disk list of simulator versions is fetched again
+SIMULATOR_VERSIONS_TTL = 24 * 3600
+SIMULATOR_VERSIONS_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'simulator_versions_cache.json')
+
 TYPES = {
                 'sbml':'SBML',\
                 'sedml':'SED-ML',\
@@ -172,12 +318,20 @@ TYPE = 'Type'
 COMPAT = 'Compatibility'
 D1 = 'd1'
 ENGINE = 'Engine'
+WALL_TIME = 'Wall time (s)'
+CPU_TIME = 'CPU time (s)'
+PEAK_MEMORY = 'Peak memory (MB)'
+AGREEMENT = 'Agreement'
+
+# error messages longer than this (in characters) show their first lines in the results tables
+# with the rest folded into a collapsible section, see ansi_to_html
+ERROR_MAX_LENGTH = 2000
 
 #define error categories for detailed error counting per engine
-# (currently only tellurium)
 # key is the tag/category used to report the category, value is a regex matching the error message
-# see MarkdownTable.process_engine_outcomes
-# TODO: use error categories in process_log_yml_dict
+# categories are tried in order and the first match wins, messages matching none are tagged "other"
+# each engine's own categories come first, followed by common_error_categories
+# see ErrorClassifier, test_engine, MarkdownTable.process_engine_outcomes and process_log_yml_dict
 error_categories=\
 {
     "tellurium":
@@ -197,8 +351,91 @@ error_categories=\
             "CV_ILL_INPUT":"CV_ILL_INPUT",
             "OutOfRange":"list index out of range",
         },
+    "amici":
+        {
+            "ParameterConstant":"Cannot turn parameter .* into a constant",
+            "MaxSteps":"[Rr]eached maximum number of steps",
+        },
+    "cbmpy":
+        {
+            "MLStripper":"'MLStripper' object has no attribute 'unescape'",
+        },
+    "ginsim":
+        {
+            "QualNamespace":"must include 1 SBML qual namespace",
+        },
+    "masspy":
+        {
+            "MassModel":"Could not load MassModel",
+        },
+    "pysces":
+        {
+            "Stoichiometry":"Unable to generate Stoichiometric Matrix",
+        },
 }
 
+# error categories seen across many engines, mined from the results json files
+common_error_categories=\
+{
+    "InvalidArchive":"is not a valid COMBINE/OMEX archive",
+    "UnsupportedLanguage":"Language for model `[^`]*` is not supported",
+    "UnsupportedSimulation":"Simulation `[^`]*` is not supported",
+    "InvalidSimulation":"Simulation `[^`]*` is invalid",
+    "InvalidTarget":"is not a valid XPath",
+    "UnsupportedTarget":"targets are not supported",
+    "AlgorithmSubstitution":"Algorithm substitution for|No suitable equivalent for 'KISAO",
+    "SBMLRead":"went wrong reading the SBML model",
+    "MissingModule":"No module named",
+    "MaxSteps":"maximum number of steps",
+    "CV_ERR_FAILURE":"CV_ERR_FAILURE",
+    "CV_TOO_MUCH_WORK":"CV_TOO_MUCH_WORK",
+    "CV_CONV_FAILURE":"CV_CONV_FAILURE",
+}
+
+for _engine in ENGINES:
+    error_categories[_engine] = {**error_categories.get(_engine, {}),
+                                 **{tag:regex for tag,regex in common_error_categories.items() if tag not in error_categories.get(_engine, {})}}
+
+class ErrorClassifier:
+    '''
+    tag error messages with the first matching category of an engine's table (see error_categories)
+
+    each engine's table is compiled once into an ordered list of (tag, test) pairs:
+    plain substring tests for literal patterns ("^literal" becomes a startswith test)
+    and precompiled regexes for the rest, tried in table order as re.search would be
+    '''
+
+    def __init__(self,categories=error_categories):
+        self.categories = categories
+        self.compiled = {}
+
+    def compile(self,engine):
+        'return the engine\'s [(tag, test)] list, test(message) is true if the category matches'
+        tests = []
+        for tag,regex in self.categories.get(engine, {}).items():
+            literal = regex[1:] if regex.startswith('^') else regex
+            if not any([c in literal for c in '.^$*+?{}[]\\|()']):
+                if regex.startswith('^'):
+                    tests.append((tag,lambda message,prefix=literal: message.startswith(prefix)))
+                else:
+                    tests.append((tag,lambda message,literal=literal: literal in message))
+            else:
+                tests.append((tag,re.compile(regex).search))
+        return tests
+
+    def classify(self,engine,message):
+        'return the category tag of the message, or "other"'
+        if engine not in self.compiled:
+            self.compiled[engine] = self.compile(engine)
+
+        message = str(message)
+        for tag,test in self.compiled[engine]:
+            if test(message):
+                return tag
+        return "other"
+
+error_classifier = ErrorClassifier()
+
 def get_entry_format(file_path, file_type):
     '''
     Get the entry format for a file.
@@ -436,22 +673,217 @@ def read_log_yml(log_filepath):
     if not os.path.isfile(log_filepath):
         return None
     with open(log_filepath) as f:
-        ym = yaml.safe_load(f)
+        ym = load_yaml(f)
     return ym['exception']['message']
 
+def load_yaml(f):
+    'load a yaml file (eg a log.yml) with YAML_LOADER'
+    return yaml.load(f, Loader=YAML_LOADER)
+
+def is_log_output_ref(value):
+    'True if value is a reference to a log output moved out of a results file by save_results'
+    return isinstance(value, dict) and 'blob' in value and 'sha256' in value
+
+def store_log_output(text, blob_dir):
+    '''
+    write text to a gzipped file in blob_dir named by its sha256, unless it is already there
+    returns the file name
+    '''
+    sha256 = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    file_name = f'{sha256}.txt.gz'
+    path = os.path.join(blob_dir, file_name)
+    if not os.path.exists(path):
+        os.makedirs(blob_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    return file_name
+
+def load_log_output(value):
+    'the text of a log output, reading it from its file if value is a reference (as returned by load_results)'
+    if not is_log_output_ref(value):
+        return value
+    with gzip.open(value['blob'], 'rt', encoding='utf-8', newline='') as f:
+        return f.read()
+
+def map_log_outputs(value, func):
+    'copy of a results or log_yml structure with func applied to every "output" value'
+    if isinstance(value, dict):
+        return {k: func(v) if k == 'output' else map_log_outputs(v, func) for k, v in value.items()}
+    if isinstance(value, list):
+        return [map_log_outputs(v, func) for v in value]
+    return value
+
+def expand_log_outputs(value):
+    'copy of a results or log_yml structure with the referenced log outputs read back in'
+    return map_log_outputs(value, load_log_output)
+
+def save_results(results, path, compact=True):
+    '''
+    write engine results (as written to results_local.json or results_remote.json) to path
+    with compact, log_yml output texts longer than LOG_OUTPUT_MAX_INLINE are stored once each
+    in LOG_OUTPUT_DIR next to path and replaced by {"blob": file, "sha256": hash, "length": characters},
+    statuses, exceptions, durations and short outputs stay inline
+    '''
+    base_dir = os.path.dirname(os.path.abspath(path))
+    blob_dir = os.path.join(base_dir, LOG_OUTPUT_DIR)
+
+    def compact_output(value):
+        if is_log_output_ref(value):
+            return dict(value, blob=os.path.relpath(os.path.join(base_dir, value['blob']), base_dir))
+        if isinstance(value, str) and len(value) > LOG_OUTPUT_MAX_INLINE:
+            file_name = store_log_output(value, blob_dir)
+            return {'blob': f'{LOG_OUTPUT_DIR}/{file_name}', 'sha256': file_name.split('.')[0], 'length': len(value)}
+        return value
+
+    if compact:
+        results = map_log_outputs(results, compact_output)
+    else:
+        results = expand_log_outputs(results)
+
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=4)
+
+def load_results(path, expand=False):
+    '''
+    load engine results written by save_results (or any earlier full results json file)
+    log outputs stay references, with absolute paths, to be read on demand with load_log_output
+    unless expand is True
+    '''
+    with open(path) as f:
+        results = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    results = map_log_outputs(results, lambda value: dict(value, blob=os.path.join(base_dir, value['blob']))
+                              if is_log_output_ref(value) else value)
+    return expand_log_outputs(results) if expand else results
+
 def find_files(directory, extension):
     files = glob.glob(f"{directory}/**/*{extension}", recursive=True)
     return files
 
+def plot_content_hash(fpath):
+    'sha256 of a pdf file, leaving out its creation and modification dates'
+    with open(fpath, 'rb') as f:
+        return hashlib.sha256(PLOT_VOLATILE_METADATA.sub(b'', f.read())).hexdigest()
+
+def plot_store_dir(plot_dir):
+    'the plot store shared by the runs whose plot folders are next to plot_dir, eg tests/plots for tests/d1_plots_local'
+    return os.path.join(os.path.dirname(os.path.normpath(plot_dir)), PLOT_STORE_DIR)
+
+def load_plot_manifest(store_dir):
+    '{plot folder name: {plot name: stored file name}} of a plot store, empty if there is none'
+    path = os.path.join(store_dir, PLOT_MANIFEST)
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_plot_manifest(store_dir, manifest):
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, PLOT_MANIFEST)
+    with open(f'{path}.{os.getpid()}.tmp', 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(f'{path}.{os.getpid()}.tmp', path)
+
+def store_d1_plot(fpath, store_dir):
+    '''
+    move a pdf into the plot store as {sha256}.pdf, or remove it if the same plot is already stored
+    returns (stored file name, True if it was not stored before)
+    '''
+    file_name = f'{plot_content_hash(fpath)}.pdf'
+    path = os.path.join(store_dir, file_name)
+    if os.path.exists(path):
+        os.remove(fpath)
+        return file_name, False
+    os.makedirs(store_dir, exist_ok=True)
+    shutil.move(fpath, path)
+    return file_name, True
+
+# move_d1_files reads and rewrites the plot manifest, remote engines finishing at the same time
+# call it from different threads (see run_engine_remote_async)
+_plot_store_lock = threading.Lock()
+
 def move_d1_files(file_paths, plot_dir='d1_plots'):
-    for fpath in file_paths:
-        # find engine.keys() in the file path and asign to engine
-        engine = next((e for e in ENGINES.keys() if e in fpath), 'unknown')
-        new_file_path = os.path.join(plot_dir, f'{engine}_{os.path.basename(fpath)}')
-        if not os.path.exists(plot_dir): os.makedirs(plot_dir, exist_ok=True)
-        if os.path.exists(new_file_path): os.remove(new_file_path)
-        print(f'Moving {fpath} to {new_file_path}')
-        shutil.move(fpath, new_file_path)
+    '''
+    move the d1 plots into the plot store next to plot_dir (see plot_store_dir), storing identical plots
+    of different engines and runs once, and record them as {engine}_{file name} in the manifest entry of plot_dir
+    plots an earlier version moved into plot_dir itself are taken into the store the first time
+    previews of the newly stored plots are rendered in parallel
+    '''
+    store_dir = plot_store_dir(plot_dir)
+    run = os.path.basename(os.path.normpath(plot_dir))
+    new_files = []
+
+    with _plot_store_lock:
+        manifest = load_plot_manifest(store_dir)
+
+        if run not in manifest and os.path.isdir(plot_dir):
+            for fpath in find_files(plot_dir, '.pdf'):
+                file_name, new = store_d1_plot(fpath, store_dir)
+                manifest.setdefault(run, {})[os.path.basename(fpath)] = file_name
+                new_files += [os.path.join(store_dir, file_name)] if new else []
+            shutil.rmtree(plot_dir)
+
+        plots = manifest.setdefault(run, {})
+        for fpath in file_paths:
+            # find engine.keys() in the file path and asign to engine
+            engine = next((e for e in ENGINES.keys() if e in fpath), 'unknown')
+            file_name, new = store_d1_plot(fpath, store_dir)
+            print(f'Moving {fpath} to {os.path.join(store_dir, file_name)}')
+            plots[f'{engine}_{os.path.basename(fpath)}'] = file_name
+            new_files += [os.path.join(store_dir, file_name)] if new else []
+
+        if file_paths or new_files:
+            save_plot_manifest(store_dir, manifest)
+            prune_plot_store(store_dir, manifest)
+
+    render_plot_previews([path for path in new_files if os.path.exists(path)])
+
+def prune_plot_store(store_dir, manifest):
+    'remove stored plots and previews no longer in the manifest, eg replaced by a new run\'s plots'
+    stored = set([os.path.splitext(file_name)[0] for plots in manifest.values() for file_name in plots.values()])
+    for file_name in os.listdir(store_dir):
+        if file_name.endswith(('.pdf', '.png')) and os.path.splitext(file_name)[0] not in stored:
+            os.remove(os.path.join(store_dir, file_name))
+
+def render_plot_preview(pdf_path, width=PLOT_PREVIEW_WIDTH):
+    '''
+    render the first page of a stored plot as a png of the given width next to it
+    with PyMuPDF if it is installed, otherwise with pdftoppm
+    returns the png path, or None if neither is available or rendering failed
+    '''
+    png_path = f'{os.path.splitext(pdf_path)[0]}.png'
+    pymupdf = None
+    for module in ['pymupdf', 'fitz']: # fitz is PyMuPDF's name before version 1.24.3
+        try:
+            pymupdf = importlib.import_module(module)
+            break
+        except ImportError:
+            pass
+
+    try:
+        if pymupdf:
+            with pymupdf.open(pdf_path) as doc:
+                zoom = width / doc[0].rect.width
+                doc[0].get_pixmap(matrix=pymupdf.Matrix(zoom, zoom)).save(png_path)
+        elif shutil.which('pdftoppm'):
+            subprocess.run(['pdftoppm', '-png', '-singlefile', '-scale-to-x', str(width), '-scale-to-y', '-1',
+                            pdf_path, png_path[:-len('.png')]], check=True, capture_output=True)
+        else:
+            return None
+    except Exception as e:
+        print(f'Could not render a preview of {pdf_path}: {e}')
+        return None
+    return png_path
+
+def render_plot_previews(pdf_paths, max_workers=PLOT_PREVIEW_WORKERS):
+    'render the previews of several plots at the same time, returns their png paths (None where not rendered)'
+    if not pdf_paths:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(render_plot_preview, pdf_paths))
 
 def find_file_in_dir(file_name, directory):
     """
@@ -476,7 +908,12 @@ def find_file_in_dir(file_name, directory):
 def d1_plots_dict(d1_plots_path='d1_plots'):
     """
     Create a dictionary with engine names as keys and d1 plot paths as values.
+    Plots in the plot store (see move_d1_files) are found through its manifest, otherwise the plot folder is searched.
     """
+    plots = load_plot_manifest(plot_store_dir(d1_plots_path)).get(os.path.basename(os.path.normpath(d1_plots_path)))
+    if plots is not None:
+        return {e: os.path.join(PLOT_STORE_DIR, file_name) for e in ENGINES.keys() for name, file_name in sorted(plots.items()) if e in name}
+
     d1_plots = find_files(d1_plots_path, '.pdf')
     # to fix broken links in output table after changing the file structure, remove the first two parts of the path
     d1_plots = [os.path.join(*Path(d1_plot).parts[1:]) for d1_plot in d1_plots]
@@ -484,6 +921,17 @@ def d1_plots_dict(d1_plots_path='d1_plots'):
     
     return d1_plots_dict
 
+def plot_preview_html(plot_path, plot_dir, default='plot'):
+    """
+    img tag of the preview of a d1 plot (a path relative to plot_dir's parent, as returned by d1_plots_dict)
+    or default if the plot has no preview
+    """
+    if isinstance(plot_path, str):
+        preview = f'{os.path.splitext(plot_path)[0]}.png'
+        if os.path.isfile(os.path.join(os.path.dirname(os.path.normpath(plot_dir)), preview)):
+            return f'<img src="{preview}" width="{PLOT_PREVIEW_WIDTH // 2}" alt="{default}">'
+    return default
+
 def create_hyperlink(path, title=None):
     """
     Create a hyperlink to a file or folder. If the path is None, return None.
@@ -497,39 +945,65 @@ def create_hyperlink(path, title=None):
         return None
     
 
-def ansi_to_html(text):
+ANSI_QUOTED = re.compile(r'"([^"]*)"')
+ANSI_BRACKETS = re.compile(r'<([^>]*)>')
+ANSI_SPAN = re.compile(r'(<span style="[^"]*">[^.:]*)([.:])')
+
+def ansi_to_html(text, max_length=None, fold=False):
+    '''
+    convert an engine error message or log output to html for the results tables
+    if the text contains a quoted string only the first one is kept, with its escapes decoded
+
+    max_length: render only the text up to the last line break before max_length characters,
+    the rest is left out with a note of its length or, with fold=True, rendered in a collapsible section
+    '''
     if text != None:
-        text_message = re.findall(r'"([^"]*)"', text) 
-        if len(text_message) > 0:
-            text = text_message
-            text = bytes(text[0], "utf-8").decode("unicode_escape")
-        text = text.replace('|', '')
+        text_message = ANSI_QUOTED.search(text)
+        if text_message:
+            text = bytes(text_message.group(1), "utf-8").decode("unicode_escape")
+
+        if max_length is None or len(text) <= max_length:
+            return ansi_text_to_html(text)
+
+        cut = text.rfind('\n', 0, max_length) + 1 or max_length
+        rest = text[cut:]
+        if fold:
+            return ansi_text_to_html(text[:cut]) + collapsible_content(ansi_text_to_html(rest), title=f'{len(rest)} more characters')
+        return ansi_text_to_html(text[:cut]) + f'<br>... {len(rest)} more characters'
 
-        # # for any text with "<*>" remove "<" as well as ">" but leave wildcard text *
-        text = re.sub(r'<([^>]*)>', r'\1', text)
+def ansi_text_to_html(text):
+    '''
+    the conversions of ansi_to_html, each one skipped when the text cannot contain what it replaces
+    '''
+    text = text.replace('|', '')
 
-        # replace color codes with html color codes
+    # # for any text with "<*>" remove "<" as well as ">" but leave wildcard text *
+    # (splitting on the brackets keeps their contents, and is quicker than substituting them)
+    if '<' in text:
+        text = ''.join(ANSI_BRACKETS.split(text))
+
+    # replace color codes with html color codes
+    # # remove .\x1b[0m
+    if '\x1b' in text:
         text = text.replace("\x1b[33m","")
         text = text.replace("\x1b[31m","")
-
-        # # remove .\x1b[0m
         text = text.replace("\x1b[0m", "")
 
-        # find first "." or ":" after "<span*" and add "</span>"after it
-        pattern = r'(<span style="[^"]*">[^.:]*)([.:])'
-        replacement = r'\1\2</span>'
-        text = re.sub(pattern, replacement, text, count=1)
+    # find first "." or ":" after "<span*" and add "</span>"after it
+    if '<span style="' in text:
+        text = ANSI_SPAN.sub(r'\1\2</span>', text, count=1)
 
-        # bullet points and new lines
+    # bullet points and new lines
+    if '\n' in text:
         text = text.replace('\r\n  - ', '</li><li>')
         text = text.replace('\r\n', '<br>')
         text = text.replace('\n', '<br>') 
 
-        # BioSimulatorsWarning:  two <br> tags after
-        text = text.replace('BioSimulatorsWarning:', '<br><br>BioSimulatorsWarning:<br><br>')
-        text = text.replace('warnings.warn(termcolor.colored(message, Colors.warning.value), category)', '<br>')
+    # BioSimulatorsWarning:  two <br> tags after
+    text = text.replace('BioSimulatorsWarning:', '<br><br>BioSimulatorsWarning:<br><br>')
+    text = text.replace('warnings.warn(termcolor.colored(message, Colors.warning.value), category)', '<br>')
 
-        return text
+    return text
 
 def check_file_compatibility_test(engine, model_filepath, experiment_filepath):
     '''
@@ -620,18 +1094,34 @@ def run_biosimulators_remote(engine,sedml_filepath,sbml_filepath):
 
     #put the sedml and sbml into a combine archive
     omex_filepath = create_omex(sedml_filepath,sbml_filepath)
-    omex_file_name = os.path.basename(omex_filepath)
 
-    # get the version of the engine
-    engine_version = biosimulations.get_simulator_versions(engine)
+    resources = size_remote_resources(model_statistics(sbml_filepath,sedml_filepath))
+    results_urls = submit_omex_remote(engine,omex_filepath,resources=resources)
+    results_urls['resources'] = resources
+
+    if os.path.exists(omex_filepath):
+        os.remove(omex_filepath)
+
+    return results_urls 
+
+def submit_omex_remote(engine,omex_filepath,version=None,resources=None):
+    '''
+    submit an existing omex archive to biosimulations to run with the engine's pinned or latest version
+    (or the given simulator version)
+    the archive is only read, so one archive can be submitted for several engines at once
+    resources: optional dict of cpus, memory and maxTime, defaults to REMOTE_RESOURCES
+    '''
+
+    omex_file_name = os.path.basename(omex_filepath)
+    resources = resources or REMOTE_RESOURCES
 
     sim_dict = {
                 "name": "test",
                 "simulator": engine,
-                "simulatorVersion": engine_version[engine][-1], # get the latest version
-                "cpus": 1,
-                "memory": 8,
-                "maxTime": 20,
+                "simulatorVersion": version or get_simulator_version(engine), # pinned or latest version
+                "cpus": resources['cpus'],
+                "memory": resources['memory'],
+                "maxTime": resources['maxTime'],
                 "envVars": [],
                 "purpose": "academic",
                 "email": "",
@@ -641,20 +1131,277 @@ def run_biosimulators_remote(engine,sedml_filepath,sbml_filepath):
         archive_file=omex_file_name,\
         sim_dict=sim_dict)
 
-    if os.path.exists(omex_filepath):
-        os.remove(omex_filepath)
-
     return results_urls 
 
-def get_remote_results(engine, download_link, output_dir='remote_results'):
+def model_statistics(sbml_filepath, sedml_filepath):
+    '''
+    cheap measures of how demanding a simulation is
+    the SBML species, reactions, events and rules, and the most points of a uniform time course in the SED-ML
+    '''
+
+    stats = {"species": 0, "reactions": 0, "events": 0, "rules": 0, "time_course_points": 0}
+
+    model = libsbml.readSBML(sbml_filepath).getModel()
+    if model is not None:
+        stats["species"] = model.getNumSpecies()
+        stats["reactions"] = model.getNumReactions()
+        stats["events"] = model.getNumEvents()
+        stats["rules"] = model.getNumRules()
+
+    sedml_doc = libsedml.readSedML(sedml_filepath)
+    for i in range(sedml_doc.getNumSimulations()):
+        sim = sedml_doc.getSimulation(i)
+        if sim.getTypeCode() == libsedml.SEDML_SIMULATION_UNIFORMTIMECOURSE:
+            stats["time_course_points"] = max(stats["time_course_points"], sim.getNumberOfPoints())
+
+    return stats
+
+def load_engine_history(test_folder='tests'):
+    '''
+    runtimes (seconds), peak memory (bytes) and cores used (CPU seconds per wall second)
+    of each engine's earlier successful runs of this model
+    runtimes are the log durations in results_remote.json, or the local wall times in results_local.json
+    for engines without a successful remote run, memory and cores come from the local telemetry
+    runs that did not succeed are left out, so an early failure does not shrink the next request
+    returns {engine: {"seconds": [...], "memory_bytes": [...], "cpus": [...]}}
+    '''
+
+    history = defaultdict(lambda: {"seconds": [], "memory_bytes": [], "cpus": []})
+    local_seconds = defaultdict(list)
+
+    for run, file_name in [('local', 'results_local.json'), ('remote', 'results_remote.json')]:
+        path = os.path.join(test_folder, file_name)
+        if not os.path.isfile(path):
+            continue
+        results = load_results(path)
+
+        for e, result in results.items():
+            if not isinstance(result, dict):
+                continue
+            log_yml = result.get('log_yml') or {}
+            if not isinstance(log_yml, dict) or log_yml.get('status') != 'SUCCEEDED':
+                continue
+            if result.get('cache') == 'hit':
+                continue
+            telemetry = result.get('telemetry') or {}
+            if run == 'remote' and log_yml.get('duration'):
+                history[e]["seconds"].append(log_yml['duration'])
+            if telemetry.get('wall_seconds'):
+                local_seconds[e].append(telemetry['wall_seconds'])
+                if telemetry.get('cpu_seconds'):
+                    history[e]["cpus"].append(telemetry['cpu_seconds'] / telemetry['wall_seconds'])
+            if telemetry.get('peak_memory_bytes'):
+                history[e]["memory_bytes"].append(telemetry['peak_memory_bytes'])
+
+    for e, seconds in local_seconds.items():
+        if not history[e]["seconds"]:
+            history[e]["seconds"] = seconds
+
+    return dict(history)
+
+def size_remote_resources(stats, history=None):
+    '''
+    choose the cpus, memory (GB) and maxTime (minutes) to request for a remote run
+    from the engine's earlier runtimes and memory use if there are any (with REMOTE_HISTORY_MARGIN),
+    otherwise from the model statistics using REMOTE_SIZE_TIERS
+    the returned dict also records the basis of the choice: "history", "model" or "default"
+    '''
+
+    resources = dict(REMOTE_RESOURCES)
+    resources['basis'] = 'default'
+
+    model_size = stats["species"] + stats["reactions"] + stats["events"] + stats["rules"]
+    for max_size, max_points, cpus, memory, max_time in REMOTE_SIZE_TIERS:
+        if model_size <= max_size and stats["time_course_points"] <= max_points:
+            resources.update({'cpus': cpus, 'memory': memory, 'maxTime': max_time, 'basis': 'model'})
+            break
+
+    if history and history.get("seconds"):
+        resources['maxTime'] = math.ceil(REMOTE_HISTORY_MARGIN * max(history["seconds"]) / 60)
+        resources['basis'] = 'history'
+    if history and history.get("memory_bytes"):
+        resources['memory'] = math.ceil(REMOTE_HISTORY_MARGIN * max(history["memory_bytes"]) / 1024**3)
+        resources['basis'] = 'history'
+    if history and history.get("cpus"):
+        # engines that only used one core get one, multithreaded ones as many as they kept busy
+        resources['cpus'] = math.ceil(max(history["cpus"]) - 0.25)
+        resources['basis'] = 'history'
+
+    for key, (lower, upper) in REMOTE_RESOURCE_LIMITS.items():
+        resources[key] = min(max(resources[key], lower), upper)
+
+    return resources
+
+class SimulatorVersionRegistry:
+    '''
+    versions of every biosimulators simulator, fetched in one request to the biosimulators api
+    and kept in a json cache file for ttl seconds so that submissions need no version lookup
+    cache_file=None keeps the versions in memory only
+    '''
+
+    def __init__(self, cache_file=SIMULATOR_VERSIONS_CACHE, ttl=SIMULATOR_VERSIONS_TTL):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.versions = None
+        self.lock = threading.Lock()
+
+    def fetch(self):
+        'fetch the versions of all simulators, in the order listed by the api'
+
+        response = requests.get(f"{biosimulations.biosimulators_api_url}/simulators")
+        response.raise_for_status()
+        versions = {}
+        for simulator in response.json():
+            versions.setdefault(simulator["id"], []).append(simulator["version"])
+        return versions
+
+    def load(self, max_age=None):
+        'return the cached versions, or None if there is no cache file or it is older than max_age'
+
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return None
+        if max_age is not None and time.time() - os.path.getmtime(self.cache_file) > max_age:
+            return None
+        with open(self.cache_file) as f:
+            return json.load(f)
+
+    def get_versions(self):
+        '''
+        return a dict of simulator id to list of versions
+        an expired cache is refetched, but still used if the api cannot be reached
+        '''
+
+        with self.lock:
+            if self.versions is None:
+                self.versions = self.load(max_age=self.ttl)
+            if self.versions is None:
+                try:
+                    self.versions = self.fetch()
+                    if self.cache_file:
+                        with open(self.cache_file, 'w') as f:
+                            json.dump(self.versions, f, indent=4)
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    self.versions = self.load()
+                    if self.versions is None:
+                        raise
+                    print(f'Failed to fetch simulator versions, using the expired cache {self.cache_file}: {e}')
+            return self.versions
+
+    def latest(self, engine):
+        'return the latest version of the engine'
+
+        versions = self.get_versions()
+        if engine not in versions:
+            # not in the bulk listing, fall back to the per-simulator endpoint
+            versions = biosimulations.get_simulator_versions(engine)
+        return versions[engine][-1]
+
+_simulator_versions = None
+
+def get_simulator_version_registry():
+    '''
+    return the shared SimulatorVersionRegistry, created on first use
+    '''
+
+    global _simulator_versions
+    if _simulator_versions is None:
+        _simulator_versions = SimulatorVersionRegistry()
+    return _simulator_versions
+
+def set_biosimulations_api_url(biosimulations_url, biosimulators_url=None):
+    '''
+    send remote runs and simulator version lookups to other api servers
+    eg a local utils.fake_biosimulations server, which serves both apis
+    biosimulators_url defaults to biosimulations_url
+    '''
+
+    global _simulator_versions
+    biosimulations.biosimulations_api_url = biosimulations_url.rstrip('/')
+    biosimulations.biosimulators_api_url = (biosimulators_url or biosimulations_url).rstrip('/')
+    # keep the other server's versions out of the on-disk cache
+    _simulator_versions = SimulatorVersionRegistry(cache_file=None)
+
+def get_simulator_version(engine):
+    '''
+    return the simulator version to use for the engine's remote runs
+    '''
+
+    if engine in PINNED_VERSIONS:
+        return PINNED_VERSIONS[engine]
+    return get_simulator_version_registry().latest(engine)
+
+def pin_simulator_versions(versions_file):
+    '''
+    pin remote runs to the simulator versions in versions_file, a json dict of engine to version
+    '''
+
+    with open(versions_file) as f:
+        PINNED_VERSIONS.update(json.load(f))
+
+def save_simulator_versions(engine_keys, versions_file):
+    '''
+    write the simulator versions currently used for the engines to versions_file
+    for use with pin_simulator_versions
+    '''
+
+    versions = {e: get_simulator_version(e) for e in engine_keys}
+    with open(versions_file, 'w') as f:
+        json.dump(versions, f, indent=4)
+    return versions
+
+def get_remote_log(logs_link):
+    '''
+    return the structured log of a finished biosimulations run, the same content as its log.yml
+    '''
+
+    response = requests.get(logs_link)
+    response.raise_for_status()
+    return response.json()
+
+def get_remote_run_status(view_link):
+    '''
+    return the status of a biosimulations run, eg QUEUED, RUNNING, SUCCEEDED or FAILED
+    '''
+
+    response = requests.get(view_link)
+    response.raise_for_status()
+    return response.json()['status']
+
+def get_remote_results(engine, download_link, output_dir='remote_results', reports=False, stats=None):
+    '''
+    download the engine's results archive and extract only the log.yml and plot pdfs
+    (and the reports if reports=True) into output_dir/engine
+    the archive itself is spooled in memory, or a temp file if large, and never saved
+    stats: optional dict filled with the download's bytes, seconds and attempts
+    '''
 
-    filepath_results = download_file_from_link(engine, download_link)
     extract_dir = os.path.join(os.getcwd(), output_dir, engine)
-    shutil.unpack_archive(filepath_results, extract_dir=extract_dir)
-    os.remove(filepath_results)
+    patterns = REMOTE_KEPT_OUTPUTS + (REMOTE_REPORT_OUTPUTS if reports else [])
+
+    with tempfile.SpooledTemporaryFile(max_size=REMOTE_SPOOL_MAX_SIZE) as archive:
+        download_file_from_link(engine, download_link, output_file=archive, stats=stats)
+        archive.seek(0)
+        extract_selected_files(archive, extract_dir, patterns)
 
     return extract_dir
 
+def extract_selected_files(archive, extract_dir, patterns):
+    '''
+    extract the members of a zip archive whose file names match any of the patterns
+    the central directory is read first so unwanted members are never decompressed
+    returns the list of extracted paths
+    '''
+
+    extracted = []
+    with zipfile.ZipFile(archive) as zf:
+        for member in zf.infolist():
+            if member.is_dir():
+                continue
+            if any([fnmatch.fnmatch(os.path.basename(member.filename), pattern) for pattern in patterns]):
+                extracted.append(zf.extract(member, extract_dir))
+
+    return extracted
+
 def rename_files_in_extract_dir(extract_dir, engine):
     
     log_yml_path = find_file_in_dir('log.yml', extract_dir)[0]
@@ -668,33 +1415,41 @@ def rename_files_in_extract_dir(extract_dir, engine):
     return extract_dir
 
 
-def run_biosimulators_docker(engine,sedml_filepath,sbml_filepath,output_dir='output',chown_outputs=True):
+def run_biosimulators_docker(engine,sedml_filepath,sbml_filepath,output_dir='output',cache=None,backend=None):
     '''
     put the sedml and sbml file into an omex archive
-    run it locally using a biosimulators docker
+    run it locally using the engine's backend (a biosimulators docker by default)
     categorise an error message in the log file
+
+    cache: optional LocalResultCache, on a hit the outputs are restored without running the engine
+    backend: optional EXECUTORS key overriding the engine's backend in ENGINES
     '''
 
     #put the sedml and sbml into a combine archive
     omex_filepath = create_omex(sedml_filepath,sbml_filepath)
+
+    if cache:
+        omex_hash = omex_content_hash(omex_filepath)
+        cached_result = cache.get_entry(engine, omex_hash, output_dir, backend)
+        if cached_result:
+            print(f'Restored cached {engine} results')
+            os.remove(omex_filepath)
+            return cached_result
+
     log_yml_path = os.path.join(output_dir,"log.yml")
     log_yml_dict = {}
     exception_message = ""
+    container_status = {}
 
     try:
-        biosimulators_core(engine,omex_filepath,output_dir=output_dir)
+        container_status = biosimulators_core(engine,omex_filepath,output_dir=output_dir,backend=backend)
+        exception_message = container_status['message']
     except Exception as e:
         exception_message = str(e)
 
-    #ensure outputs are owned by the user
-    if 'getuid' in dir(os) and chown_outputs:
-        uid = os.getuid()
-        gid = os.getgid()
-        os.system(f'sudo chown -R {uid}:{gid} {output_dir}')
-
     if os.path.exists(log_yml_path):
         with open(log_yml_path) as f:
-            log_yml_dict = yaml.safe_load(f)
+            log_yml_dict = load_yaml(f)
 
     # to deal with vcell like cases where there is a log_yml with status SUCCEEDED but a detailedErrorLog.txt with "RuntimeError"
     detailed_error_log_dict = {}
@@ -707,45 +1462,658 @@ def run_biosimulators_docker(engine,sedml_filepath,sbml_filepath,output_dir='out
 
     if os.path.exists(omex_filepath):
         os.remove(omex_filepath)
+
+    telemetry = container_status.pop('telemetry', {})
+    result = {"exception_message":exception_message,"log_yml":log_yml_dict, "detailed_error_log":detailed_error_log_dict, "container":container_status, "telemetry":telemetry}
+
+    # the exact image or package build that ran, recorded by utils.history
+    try:
+        result['engine_digest'] = get_engine_digest(engine, backend)
+    except docker.errors.DockerException:
+        result['engine_digest'] = None
+
+    # only cache runs that finished by themselves, not infrastructure errors or timeouts
+    if cache and container_status.get('status') in ['SUCCEEDED', 'FAILED']:
+        cache.set_entry(engine, omex_hash, output_dir, result, backend)
+        result['cache'] = 'miss'
     
-    return {"exception_message":exception_message,"log_yml":log_yml_dict, "detailed_error_log":detailed_error_log_dict}
+    return result
+
+def get_engine_limits(engine):
+    '''
+    return the docker resource limits for the engine
+    DOCKER_LIMITS updated with any per-engine 'limits' entry in ENGINES
+    '''
+    limits = dict(DOCKER_LIMITS)
+    limits.update(ENGINES.get(engine, {}).get('limits', {}))
+    return limits
 
-def biosimulators_core(engine,omex_filepath,output_dir=None):
+def biosimulators_core(engine,omex_filepath,output_dir=None,backend=None):
     '''
     run the omex file using biosimulators
-    calls biosimulators via docker locally
-    assumes local docker is setup
     engine can be any string that matches a biosimulators docker "URI":
     ghcr.io/biosimulators/{engine}
 
     omex_filepath: the OMEX file to run
     output_dir: folder to write the simulation outputs to
-    '''
+    backend: one of EXECUTORS, defaults to the engine's 'backend' in ENGINES (or "docker")
 
-    omex_filepath_no_spaces = remove_spaces_from_filename(omex_filepath)
+    every backend writes the same layout to output_dir (log.yml, reports and plots, see KEPT_OUTPUTS)
 
-    #directory containing omex file needs mapping into the container as the input folders
-    omex_dir = os.path.dirname(os.path.abspath(omex_filepath_no_spaces))
-    omex_file = os.path.basename(os.path.abspath(omex_filepath_no_spaces))
+    returns a dict describing how the run finished:
+        status: "SUCCEEDED", "FAILED" (non-zero exit code), "TIMEOUT" or "OOMKilled"
+        exit_code: the exit code (None if it never exited by itself)
+        oom_killed: whether the run was killed for exceeding mem_limit
+        message: "" if the run succeeded, otherwise a description of the failure
+        backend: the backend used
+    '''
+
+    if not backend:
+        backend = ENGINES.get(engine, {}).get('backend', 'docker')
+    if backend not in EXECUTORS:
+        raise ValueError(f"unknown backend {backend}, expected one of {list(EXECUTORS.keys())}")
 
-    mount_in = docker.types.Mount("/root/in",omex_dir,type="bind",read_only=True)
+    omex_filepath_no_spaces = remove_spaces_from_filename(omex_filepath)
+    omex_filepath_abs = os.path.abspath(omex_filepath_no_spaces)
 
     #we want the output folder to be different to the input folder
     #to avoid the "file already exists" type error
     if not output_dir:
-        output_dir = os.path.join(omex_dir,'output')
+        output_dir = os.path.join(os.path.dirname(omex_filepath_abs),'output')
 
+    output_dir = os.path.abspath(output_dir)
     os.makedirs(output_dir,exist_ok=True)
 
-    mount_out = docker.types.Mount("/root/out",output_dir,type="bind")
-    client = docker.from_env()
-    client.containers.run(f"ghcr.io/biosimulators/{engine}",
+    try:
+        run_status = EXECUTORS[backend](engine, omex_filepath_abs, output_dir)
+    finally:
+        if os.path.exists(omex_filepath_no_spaces):
+            os.remove(omex_filepath_no_spaces)
+
+    run_status['backend'] = backend
+
+    return run_status
+
+def docker_executor(engine,omex_filepath,output_dir):
+    '''
+    run the omex file in the biosimulators docker image of the engine
+    assumes local docker is setup
+
+    the container runs with the memory, CPU and wall-clock limits from get_engine_limits
+    a container still running at the timeout is stopped, and it is always removed afterwards
+
+    the container runs as the calling user (where the OS has uids) so outputs need no chown
+    the engine writes to a tmpfs scratch folder, only KEPT_OUTPUTS are copied to output_dir
+    '''
+
+    #directory containing omex file needs mapping into the container as the input folders
+    omex_dir = os.path.dirname(omex_filepath)
+    omex_file = os.path.basename(omex_filepath)
+
+    #mount points are outside /root so they are reachable when running as a non-root user
+    mount_in = docker.types.Mount("/in",omex_dir,type="bind",read_only=True)
+    mount_out = docker.types.Mount("/out",output_dir,type="bind")
+
+    image = engine_image(engine)
+    limits = get_engine_limits(engine)
+
+    client = get_docker_client()
+
+    #run the image's own entrypoint through the wrapper that copies out the kept outputs
+    entrypoint = ['/bin/sh', '-c', docker_wrapper('/scratch/out', '/out'), 'sh']
+    command = get_image_entrypoint(image) + ['-i', f'/in/{omex_file}', '-o', '/scratch/out']
+
+    start_time = time.time()
+    container = client.containers.run(image,
                         mounts=[mount_in,mount_out],
-                        command=f"-i '/root/in/{omex_file}' -o /root/out",
-                        auto_remove=True)
-    
-    if os.path.exists(omex_filepath_no_spaces):
-        os.remove(omex_filepath_no_spaces)
+                        entrypoint=entrypoint,
+                        command=command,
+                        **docker_run_options(limits))
+    startup_seconds = time.time() - start_time
+    sampler = ContainerStatsSampler(container)
+
+    container_status = {"status":"", "exit_code":None, "oom_killed":False, "message":""}
+    try:
+        try:
+            container_status['exit_code'] = container.wait(timeout=limits['timeout'])['StatusCode']
+        except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectionError):
+            print(f'{engine} exceeded the {limits["timeout"]} s timeout, stopping container')
+            container.stop(timeout=DOCKER_STOP_TIMEOUT)
+            container_status['status'] = 'TIMEOUT'
+            container_status['message'] = f"TIMEOUT: {image} exceeded the {limits['timeout']} s wall-clock limit and was stopped"
+
+        container.reload()
+        container_status['oom_killed'] = bool(container.attrs['State'].get('OOMKilled', False))
+    finally:
+        container_status['telemetry'] = sampler.stop()
+        container_status['telemetry']['wall_seconds'] = round(time.time() - start_time, 3)
+        container_status['telemetry']['startup_seconds'] = round(startup_seconds, 3)
+        container.remove(force=True)
+
+    if container_status['status'] != 'TIMEOUT':
+        if container_status['oom_killed']:
+            container_status['status'] = 'OOMKilled'
+            container_status['message'] = f"OOMKilled: {image} exceeded the {limits['mem_limit']} memory limit"
+        elif container_status['exit_code'] != 0:
+            container_status['status'] = 'FAILED'
+            container_status['message'] = str(docker.errors.ContainerError(container, container_status['exit_code'], shlex.join(entrypoint + command), image, None))
+        else:
+            container_status['status'] = 'SUCCEEDED'
+
+    return container_status
+
+def engine_image(engine):
+    '''
+    return the docker image reference used to run the engine, pinned if set in PINNED_IMAGES
+    '''
+    return PINNED_IMAGES.get(engine, f"ghcr.io/biosimulators/{engine}")
+
+def pin_engine_images(images_file):
+    '''
+    pin engines to the image digests recorded by prepare_engines in images_file
+    '''
+    with open(images_file) as f:
+        images = json.load(f)
+    for engine, info in images.items():
+        if info.get('digest'):
+            PINNED_IMAGES[engine] = info['digest']
+
+def pull_engine_image(engine):
+    '''
+    pull the engine's latest docker image and return its digest, id, size and pull duration
+    '''
+    start_time = time.time()
+    image = get_docker_client().images.pull(f"ghcr.io/biosimulators/{engine}", tag='latest')
+    repo_digests = image.attrs.get('RepoDigests', [])
+
+    return {"image": f"ghcr.io/biosimulators/{engine}:latest",
+            "digest": repo_digests[0] if repo_digests else None,
+            "id": image.id,
+            "size": image.attrs.get('Size'),
+            "pull_seconds": round(time.time() - start_time, 3)}
+
+def warm_up_engine(engine, warm_up_omex_filepath):
+    '''
+    run a small archive with the engine so later runs do not pay for first-use costs
+    (image layers read from disk, page cache, python bytecode compilation)
+    returns the run status and duration, engines that cannot run SBML simply fail quickly
+    '''
+    with tempfile.TemporaryDirectory() as warm_up_dir:
+        # biosimulators_core removes the archive it runs, so run a copy
+        omex_filepath = os.path.join(warm_up_dir, f'warm_up_{engine}.omex')
+        shutil.copy(warm_up_omex_filepath, omex_filepath)
+        start_time = time.time()
+        try:
+            run_status = biosimulators_core(engine, omex_filepath, output_dir=os.path.join(warm_up_dir, 'output'))
+        except Exception as e:
+            run_status = {"status": "ERROR", "message": str(e)}
+
+    return {"status": run_status['status'], "seconds": round(time.time() - start_time, 3)}
+
+def prepare_engines(engine_keys, max_workers=4, images_file='engine_images.json', pin=False, warm_up=True):
+    '''
+    pull the docker images of the engines in parallel, max_workers at a time
+    record their digests and sizes in images_file and optionally pin the engines to them
+    then optionally run a small warm up archive (SBML/LEMS_NML2_Ex9_FN) with each engine
+
+    run this before timing local runs so they measure simulation time rather than registry downloads
+    '''
+    images = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(pull_engine_image, e): e for e in engine_keys}
+        for future in concurrent.futures.as_completed(futures):
+            e = futures[future]
+            try:
+                images[e] = future.result()
+                print(f"Pulled {e}: {images[e]['digest']} ({images[e]['size']} bytes, {images[e]['pull_seconds']} s)")
+            except Exception as emessage:
+                images[e] = {"error": str(emessage)}
+                print(f"Failed to pull {e}: {emessage}")
+
+    if pin:
+        for e, info in images.items():
+            if info.get('digest'):
+                PINNED_IMAGES[e] = info['digest']
+
+    if warm_up:
+        engines_pulled = [e for e in engine_keys if 'error' not in images[e]]
+        with tempfile.TemporaryDirectory() as warm_up_dir:
+            # create_omex needs paths relative to the folder holding the model files
+            starting_dir = os.getcwd()
+            os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'SBML'))
+            try:
+                warm_up_omex_filepath = create_omex('LEMS_NML2_Ex9_FN.sedml', 'LEMS_NML2_Ex9_FN.sbml',
+                                                    omex_filepath=os.path.join(warm_up_dir, 'warm_up.omex'))
+            finally:
+                os.chdir(starting_dir)
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(warm_up_engine, e, warm_up_omex_filepath): e for e in engines_pulled}
+                for future in concurrent.futures.as_completed(futures):
+                    e = futures[future]
+                    images[e]['warm_up'] = future.result()
+                    print(f"Warmed up {e}: {images[e]['warm_up']}")
+
+    images = {e: images[e] for e in engine_keys}
+    with open(images_file, 'w') as fout:
+        json.dump(images, fout, indent=4)
+
+    return images
+
+def get_docker_client():
+    '''
+    return the docker client shared by all local docker runs, created on first use
+    '''
+    global _docker_client
+    if _docker_client is None:
+        _docker_client = docker.from_env()
+    return _docker_client
+
+_docker_client = None
+
+def get_image_entrypoint(image):
+    '''
+    return the entrypoint of a docker image as a list, pulling the image if it is missing
+    '''
+    client = get_docker_client()
+    try:
+        image_entrypoint = client.images.get(image).attrs['Config']['Entrypoint']
+    except docker.errors.ImageNotFound:
+        image_entrypoint = client.images.pull(image).attrs['Config']['Entrypoint']
+    return list(image_entrypoint or [])
+
+def docker_wrapper(scratch, out):
+    '''
+    DOCKER_WRAPPER for engine outputs written to scratch and kept outputs copied to out
+    '''
+    patterns = ' -o '.join([f"-name '{pattern}'" for pattern in KEPT_OUTPUTS])
+    return DOCKER_WRAPPER.format(patterns=patterns, scratch=scratch, out=out)
+
+def docker_run_options(limits):
+    '''
+    containers.run options shared by one-off and warm pool containers:
+    resource limits, tmpfs scratch folder and the calling user's uid/gid
+    '''
+    return dict(tmpfs={'/scratch': f"rw,size={limits['scratch_size']},mode=1777"},
+                working_dir='/scratch',
+                environment={'HOME': '/scratch'},
+                user=f'{os.getuid()}:{os.getgid()}' if 'getuid' in dir(os) else None,
+                mem_limit=limits['mem_limit'],
+                nano_cpus=int(limits['cpus']*1e9),
+                detach=True)
+
+class EngineContainerPool:
+    '''
+    keeps one long-lived container per engine and runs each omex archive in it with docker exec
+    instead of starting a new container per archive
+
+    all containers share a host staging folder, mounted at /in (read only) and /out
+    each job's archive is copied into /in/{job}, the engine writes to the tmpfs /scratch/{job}
+    and the kept outputs are copied to /out/{job} and then moved to the job's output_dir
+
+    a container is replaced after max_jobs jobs, or after any failed job (a non-zero exit status,
+    a timeout, an OOM kill or the container stopping), so a job never runs after one that may
+    have left the engine's state broken
+    '''
+
+    def __init__(self,max_jobs=DOCKER_POOL_MAX_JOBS):
+        self.max_jobs = max_jobs
+        self.staging_dir = tempfile.mkdtemp(prefix='engine_pool_')
+        os.makedirs(os.path.join(self.staging_dir,'in'))
+        os.makedirs(os.path.join(self.staging_dir,'out'))
+        self.containers = {}
+        self.n_jobs = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def get_container(self,engine):
+        'return the running warm container for the engine, starting one if needed'
+
+        if engine in self.containers:
+            return self.containers[engine]
+
+        image = engine_image(engine)
+        mount_in = docker.types.Mount("/in",os.path.join(self.staging_dir,'in'),type="bind",read_only=True)
+        mount_out = docker.types.Mount("/out",os.path.join(self.staging_dir,'out'),type="bind")
+
+        entrypoint = get_image_entrypoint(image)
+        container = get_docker_client().containers.run(image,
+                            mounts=[mount_in,mount_out],
+                            entrypoint=['/bin/sh', '-c', DOCKER_IDLE_COMMAND],
+                            command=[],
+                            **docker_run_options(get_engine_limits(engine)))
+
+        self.containers[engine] = {'container':container, 'entrypoint':entrypoint, 'jobs':0}
+        return self.containers[engine]
+
+    def recycle(self,engine):
+        'remove the engine\'s warm container, the next job starts a fresh one'
+        if engine in self.containers:
+            try:
+                self.containers[engine]['container'].remove(force=True)
+            except docker.errors.APIError:
+                pass
+            del self.containers[engine]
+
+    def run(self,engine,omex_filepath,output_dir):
+        '''
+        run the omex file in the engine's warm container
+        returns the same status dict as docker_executor
+        '''
+
+        limits = get_engine_limits(engine)
+        warm = self.get_container(engine)
+        container = warm['container']
+        client = get_docker_client()
+
+        self.n_jobs += 1
+        job = f'job{self.n_jobs}'
+        job_in = os.path.join(self.staging_dir,'in',job)
+        job_out = os.path.join(self.staging_dir,'out',job)
+        os.makedirs(job_in)
+        omex_file = os.path.basename(omex_filepath)
+        shutil.copy(omex_filepath, os.path.join(job_in,omex_file))
+
+        args = ['-i', f'/in/{job}/{omex_file}', '-o', f'/scratch/{job}']
+        command = ['/bin/sh', '-c', docker_wrapper(f'/scratch/{job}', f'/out/{job}'), 'sh'] + warm['entrypoint'] + args
+        options = docker_run_options(limits)
+        start_time = time.time()
+        exec_id = client.api.exec_create(container.id, command, user=options['user'] or '',
+                                         workdir='/scratch', environment=options['environment'])['Id']
+
+        container_status = {"status":"", "exit_code":None, "oom_killed":False, "message":""}
+        image = engine_image(engine)
+
+        #exec_start blocks until the job ends, so run it in a thread to apply the timeout
+        #the warm container's counters are cumulative so the sampler reports this job's increase
+        job_thread = threading.Thread(target=client.api.exec_start, args=(exec_id,), daemon=True)
+        sampler = ContainerStatsSampler(container, relative=True)
+        job_thread.start()
+        startup_seconds = time.time() - start_time
+        job_thread.join(timeout=limits['timeout'])
+        container_status['telemetry'] = sampler.stop()
+        container_status['telemetry']['wall_seconds'] = round(time.time() - start_time, 3)
+        container_status['telemetry']['startup_seconds'] = round(startup_seconds, 3)
+        warm['jobs'] += 1
+
+        if job_thread.is_alive():
+            print(f'{engine} exceeded the {limits["timeout"]} s timeout, stopping warm container')
+            self.recycle(engine)
+            container_status['status'] = 'TIMEOUT'
+            container_status['message'] = f"TIMEOUT: {image} exceeded the {limits['timeout']} s wall-clock limit and was stopped"
+        else:
+            container_status['exit_code'] = client.api.exec_inspect(exec_id)['ExitCode']
+            container.reload()
+            state = container.attrs['State']
+            container_status['oom_killed'] = bool(state.get('OOMKilled', False))
+            if container_status['oom_killed']:
+                container_status['status'] = 'OOMKilled'
+                container_status['message'] = f"OOMKilled: {image} exceeded the {limits['mem_limit']} memory limit"
+            elif container_status['exit_code'] != 0:
+                container_status['status'] = 'FAILED'
+                container_status['message'] = str(docker.errors.ContainerError(container, container_status['exit_code'], shlex.join(command), image, None))
+            else:
+                container_status['status'] = 'SUCCEEDED'
+
+            if container_status['status'] != 'SUCCEEDED' or not state.get('Running', False) or warm['jobs'] >= self.max_jobs:
+                self.recycle(engine)
+
+        if os.path.isdir(job_out):
+            shutil.copytree(job_out, output_dir, dirs_exist_ok=True)
+        shutil.rmtree(job_in, ignore_errors=True)
+        shutil.rmtree(job_out, ignore_errors=True)
+
+        return container_status
+
+    def close(self):
+        'remove all warm containers and the staging folder'
+        for engine in list(self.containers.keys()):
+            self.recycle(engine)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+class ContainerStatsSampler:
+    '''
+    samples a running container's resource counters in a background thread
+    stop() returns the telemetry recorded while sampling:
+        peak_memory_bytes: highest sampled memory usage
+        cpu_seconds: CPU time used
+        block_io_bytes: bytes read from and written to block devices
+    relative=True reports CPU and block I/O as the increase since the first sample,
+    for reused containers whose counters include earlier jobs
+    a failed sample is logged (once) and counted in sample_errors, sampling goes on until the container exits
+    '''
+
+    def __init__(self,container,interval=TELEMETRY_INTERVAL,relative=False):
+        self.container = container
+        self.interval = interval
+        self.relative = relative
+        self.samples = []
+        self.n_errors = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+
+    def sample(self):
+        'record samples until stopped or the container has exited'
+        while not self.stop_event.is_set():
+            try:
+                stats = self.container.stats(stream=False, one_shot=True)
+                if stats.get('memory_stats'):
+                    self.samples.append(stats)
+            except docker.errors.NotFound:
+                break
+            except Exception as e:
+                self.n_errors += 1
+                if self.n_errors == 1:
+                    print(f'Failed to sample the resource use of container {self.container.name}, retrying: {e}')
+                if not self.container_running():
+                    break
+            self.stop_event.wait(self.interval)
+
+    def container_running(self):
+        'False once the container has exited or been removed, True if its state cannot be read'
+        try:
+            self.container.reload()
+        except docker.errors.NotFound:
+            return False
+        except Exception:
+            return True
+        return self.container.status in ['created', 'running', 'restarting']
+
+    @staticmethod
+    def cpu_ns(stats):
+        return stats.get('cpu_stats', {}).get('cpu_usage', {}).get('total_usage', 0)
+
+    @staticmethod
+    def block_io(stats):
+        entries = (stats.get('blkio_stats') or {}).get('io_service_bytes_recursive') or []
+        return sum([entry['value'] for entry in entries if entry.get('op', '').lower() in ['read', 'write']])
+
+    def stop(self):
+        'stop sampling and return the telemetry dict'
+        self.stop_event.set()
+        self.thread.join(timeout=10)
+
+        if not self.samples:
+            return {"peak_memory_bytes": None, "cpu_seconds": None, "block_io_bytes": None, "n_samples": 0,
+                    "sample_errors": self.n_errors}
+
+        first, last = self.samples[0], self.samples[-1]
+        cpu_ns = self.cpu_ns(last) - (self.cpu_ns(first) if self.relative else 0)
+        block_io = self.block_io(last) - (self.block_io(first) if self.relative else 0)
+        return {"peak_memory_bytes": max([stats['memory_stats'].get('usage', 0) for stats in self.samples]),
+                "cpu_seconds": round(cpu_ns / 1e9, 3),
+                "block_io_bytes": block_io,
+                "n_samples": len(self.samples),
+                "sample_errors": self.n_errors}
+
+def get_warm_pool():
+    '''
+    return the warm container pool used by the "docker-warm" backend
+    created on first use and closed when python exits
+    '''
+    global _warm_pool
+    if _warm_pool is None:
+        _warm_pool = EngineContainerPool()
+        atexit.register(_warm_pool.close)
+    return _warm_pool
+
+_warm_pool = None
+
+def warm_pool_executor(engine,omex_filepath,output_dir):
+    '''
+    run the omex file in a long-lived warm container of the engine with docker exec, see EngineContainerPool
+    '''
+    return get_warm_pool().run(engine,omex_filepath,output_dir)
+
+def copy_kept_outputs(scratch_dir, output_dir):
+    '''
+    copy the files matching KEPT_OUTPUTS from scratch_dir to output_dir
+    keeping their paths relative to scratch_dir
+    '''
+    for root, _, files in os.walk(scratch_dir):
+        for file in files:
+            if not any([fnmatch.fnmatch(file, pattern) for pattern in KEPT_OUTPUTS]):
+                continue
+            rel_path = os.path.relpath(os.path.join(root, file), scratch_dir)
+            os.makedirs(os.path.dirname(os.path.join(output_dir, rel_path)), exist_ok=True)
+            shutil.copy(os.path.join(root, file), os.path.join(output_dir, rel_path))
+
+def subprocess_executor(engine,omex_filepath,output_dir):
+    '''
+    run the omex file with the installed biosimulators-{engine} command line tool
+    the wall-clock timeout from get_engine_limits applies, memory and CPU limits do not
+    '''
+
+    cli = shutil.which(f'biosimulators-{engine}')
+    if not cli:
+        raise RuntimeError(f"biosimulators-{engine} not found, install biosimulators_{engine} to use the subprocess backend")
+
+    limits = get_engine_limits(engine)
+    command = [cli, '-i', omex_filepath, '-o']
+    run_status = {"status":"", "exit_code":None, "oom_killed":False, "message":""}
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        start_time = time.time()
+        usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        try:
+            process = subprocess.run(command + [scratch_dir], timeout=limits['timeout'])
+            run_status['exit_code'] = process.returncode
+        except subprocess.TimeoutExpired:
+            print(f'{engine} exceeded the {limits["timeout"]} s timeout, process killed')
+            run_status['status'] = 'TIMEOUT'
+            run_status['message'] = f"TIMEOUT: biosimulators-{engine} exceeded the {limits['timeout']} s wall-clock limit and was killed"
+        usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        #ru_maxrss is the largest child so far (kB on linux), so it is only an upper bound for this run
+        #ru_inblock/ru_oublock count 512 byte blocks
+        run_status['telemetry'] = {
+            "wall_seconds": round(time.time() - start_time, 3),
+            "startup_seconds": None,
+            "peak_memory_bytes": usage_after.ru_maxrss * 1024,
+            "cpu_seconds": round((usage_after.ru_utime + usage_after.ru_stime)
+                                 - (usage_before.ru_utime + usage_before.ru_stime), 3),
+            "block_io_bytes": ((usage_after.ru_inblock + usage_after.ru_oublock)
+                               - (usage_before.ru_inblock + usage_before.ru_oublock)) * 512,
+        }
+
+        copy_kept_outputs(scratch_dir, output_dir)
+
+    if run_status['status'] != 'TIMEOUT':
+        if run_status['exit_code'] != 0:
+            run_status['status'] = 'FAILED'
+            run_status['message'] = f"Command '{' '.join(command)}' returned non-zero exit status {run_status['exit_code']}"
+        else:
+            run_status['status'] = 'SUCCEEDED'
+
+    return run_status
+
+def inprocess_log_status(result, scratch_dir):
+    '''
+    (status, exception message) of an in-process run, exec_sedml_docs_in_combine_archive records
+    failed SED-ML documents in its returned log (and log.yml) instead of raising
+    uses the returned CombineArchiveLog, or the log.yml written to scratch_dir
+    status is None if neither is available
+    '''
+
+    log = result[1] if isinstance(result, tuple) and len(result) > 1 else None
+    if log is not None and hasattr(log, 'status'):
+        status = getattr(log.status, 'value', log.status)
+        exception = getattr(log, 'exception', None)
+        message = f"{type(exception).__name__}: {exception}" if exception else ""
+        return status, message
+
+    log_files = glob.glob(os.path.join(scratch_dir, '**', 'log.yml'), recursive=True)
+    if not log_files:
+        return None, ""
+    with open(log_files[0]) as f:
+        log_yml = load_yaml(f) or {}
+    exception = log_yml.get('exception') or {}
+    message = f"{exception.get('type', '')}: {exception.get('message', '')}" if exception else ""
+    return log_yml.get('status'), message
+
+# biosimulators packages keep module level state (eg libsedml/libsbml documents, matplotlib figures)
+# and are not thread-safe, so in-process runs of this interpreter (eg the worker threads of
+# utils.fake_biosimulations) run one at a time
+_inprocess_lock = threading.Lock()
+
+def inprocess_executor(engine,omex_filepath,output_dir):
+    '''
+    run the omex file by calling the installed biosimulators_{engine} python package directly
+    no resource limits or timeout apply, the simulation runs in the current interpreter
+    and concurrent calls wait for each other (see _inprocess_lock)
+    '''
+
+    try:
+        module = importlib.import_module(f'biosimulators_{engine}')
+    except ImportError as e:
+        raise RuntimeError(f"biosimulators_{engine} not importable, install it to use the in-process backend: {e}")
+
+    run_status = {"status":"", "exit_code":None, "oom_killed":False, "message":""}
+
+    with _inprocess_lock, tempfile.TemporaryDirectory() as scratch_dir:
+        start_time = time.time()
+        cpu_before = time.process_time()
+        try:
+            result = module.exec_sedml_docs_in_combine_archive(omex_filepath, scratch_dir)
+            status, message = inprocess_log_status(result, scratch_dir)
+            if message or status not in [None, 'SUCCEEDED']:
+                run_status['status'] = 'FAILED'
+                run_status['exit_code'] = 1
+                run_status['message'] = message or f"biosimulators_{engine} finished with status {status}"
+            else:
+                run_status['status'] = 'SUCCEEDED'
+                run_status['exit_code'] = 0
+        except Exception as e:
+            run_status['status'] = 'FAILED'
+            run_status['exit_code'] = 1
+            run_status['message'] = f"biosimulators_{engine} raised {type(e).__name__}: {e}"
+
+        #memory and block I/O cannot be separated from the rest of this interpreter
+        run_status['telemetry'] = {
+            "wall_seconds": round(time.time() - start_time, 3),
+            "startup_seconds": None,
+            "peak_memory_bytes": None,
+            "cpu_seconds": round(time.process_time() - cpu_before, 3),
+            "block_io_bytes": None,
+        }
+
+        copy_kept_outputs(scratch_dir, output_dir)
+
+    return run_status
+
+# local execution backends, selected per engine by the 'backend' entry in ENGINES
+# each takes (engine, absolute omex path, absolute output dir) and returns a run status dict
+EXECUTORS = {
+    'docker': docker_executor,
+    'docker-warm': warm_pool_executor,
+    'subprocess': subprocess_executor,
+    'in-process': inprocess_executor,
+}
 
 def test_engine(engine,filename,error_categories=error_categories):
     '''
@@ -770,11 +2138,9 @@ def test_engine(engine,filename,error_categories=error_categories):
     if unknown_engine:
         raise RuntimeError(f"unknown engine {engine}")
 
-    for tag in error_categories[engine]:
-        if re.search(error_categories[engine][tag],error_str):
-            return [tag,f"```{error_str}```"]
-    
-    return ["other",f"```{error_str}```"]
+    classifier = error_classifier if error_categories is error_classifier.categories else ErrorClassifier(error_categories)
+
+    return [classifier.classify(engine,error_str),f"```{error_str}```"]
 
 @dataclass
 class SuppressOutput:
@@ -881,6 +2247,191 @@ class RequestCache:
         if self.mode == "store" or self.mode == "auto": self.set_entry(request,response)
         return response
 
+def omex_content_hash(omex_filepath):
+    '''
+    sha256 of the files inside an omex archive, independent of the zip timestamps
+    the manifest and metadata are skipped as they only hold file names and creation dates
+    (create_omex gives the fixed sedml file a random temporary name)
+    '''
+    entry_hashes = []
+    with zipfile.ZipFile(omex_filepath) as archive:
+        for name in archive.namelist():
+            if os.path.basename(name) in ['manifest.xml', 'metadata.rdf'] or name.endswith('/'):
+                continue
+            entry_hashes.append(hashlib.sha256(archive.read(name)).hexdigest())
+
+    return hashlib.sha256(''.join(sorted(entry_hashes)).encode('UTF-8')).hexdigest()
+
+def get_engine_digest(engine, backend=None):
+    '''
+    identify the exact engine build used for a local run
+    docker: the id (content digest) of the local ghcr.io/biosimulators/{engine} image, None if not pulled yet
+    subprocess/in-process: the installed biosimulators_{engine} package version, None if not installed
+    '''
+    if not backend:
+        backend = ENGINES.get(engine, {}).get('backend', 'docker')
+
+    if backend in ['docker', 'docker-warm']:
+        try:
+            return get_docker_client().images.get(engine_image(engine)).id
+        except docker.errors.ImageNotFound:
+            return None
+
+    try:
+        return f"biosimulators_{engine}=={importlib.metadata.version(f'biosimulators_{engine}')}"
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+class LocalResultCache:
+    '''
+    content-addressed cache of local engine runs, used to avoid rerunning an engine
+    on an identical omex archive with an identical engine image
+
+    entries are keyed by (engine, backend kind, engine digest, omex content hash) and stored as
+        {direc}/{engine}/{kind}/{digest}/{omex hash}/result.json   run_biosimulators_docker result dict
+        {direc}/{engine}/{kind}/{digest}/{omex hash}/outputs/      log.yml, detailedErrorLog.txt, reports and plots
+    kind is "docker" for the docker and docker-warm backends (keyed by image id) and "package" for the
+    subprocess and in-process backends (keyed by the installed package version), see get_engine_digest
+    storing an entry removes the engine's entries for any other digest of the same kind
+    so a docker pull that changes the image invalidates the old results
+    '''
+
+    def __init__(self,mode="auto",direc="local_results_cache"):
+        '''
+        mode:
+            "off" to disable caching (does not wipe any existing cache data)
+            "store" to always run the engines and store fresh results in the cache
+            "auto" to restore results on a hit and run and store them on a miss
+        direc: the directory used to store the cache
+        '''
+        self.mode = mode
+
+        #store absolute cache dir path to ensure it is found regardless of current directory
+        self.absolute_dir = os.path.join(os.getcwd(),direc)
+
+    def __bool__(self):
+        return self.mode != "off"
+
+    def get_path(self,engine,omex_hash,backend=None):
+        '''
+        return path to the cache entry for the engine's current digest with the backend
+        (the engine's backend in ENGINES by default), or None if the digest cannot be determined
+        '''
+        backend = backend or ENGINES.get(engine, {}).get('backend', 'docker')
+        digest = get_engine_digest(engine, backend)
+        if not digest:
+            return None
+
+        kind = 'docker' if backend in ['docker', 'docker-warm'] else 'package'
+        return os.path.join(self.absolute_dir, engine, kind, re.sub(r'[^\w.=-]', '_', digest), omex_hash)
+
+    def get_entry(self,engine,omex_hash,output_dir,backend=None):
+        '''
+        restore a cached run into output_dir and return its result dict
+        return None on a cache miss
+        '''
+        if self.mode != "auto":
+            return None
+
+        path = self.get_path(engine,omex_hash,backend)
+        if not path or not os.path.isfile(os.path.join(path,'result.json')):
+            return None
+
+        with open(os.path.join(path,'result.json')) as f:
+            result = json.load(f)
+
+        shutil.copytree(os.path.join(path,'outputs'), output_dir, dirs_exist_ok=True)
+        result['cache'] = 'hit'
+        # nothing was measured now, the original run's telemetry is kept apart so it is not reported as this run's
+        result['cached_telemetry'] = result.pop('telemetry', {})
+
+        return result
+
+    def set_entry(self,engine,omex_hash,output_dir,result,backend=None):
+        '''
+        save a run's result dict and kept outputs to the cache
+        '''
+        path = self.get_path(engine,omex_hash,backend)
+        if not path:
+            return
+
+        # drop results from previous images (or package versions) of this engine
+        digest_dir = os.path.dirname(path)
+        engine_dir = os.path.dirname(digest_dir)
+        if os.path.isdir(engine_dir):
+            for old_digest_dir in os.listdir(engine_dir):
+                if os.path.join(engine_dir, old_digest_dir) != digest_dir:
+                    shutil.rmtree(os.path.join(engine_dir, old_digest_dir), ignore_errors=True)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+        copy_kept_outputs(output_dir, os.path.join(path,'outputs'))
+        os.makedirs(os.path.join(path,'outputs'), exist_ok=True)
+
+        with open(os.path.join(path,'result.json'),'w') as fout:
+            json.dump(result, fout, indent=4)
+
+class SubmissionLedger:
+    '''
+    record of remote runs, used to avoid resubmitting an identical omex archive
+    to biosimulations for the same engine and simulator version
+
+    entries are keyed by (omex content hash, engine, simulator version) and hold the
+    response code, view/download/logs urls and final log_yml of the run, stored in one json file
+    '''
+
+    def __init__(self,mode="auto",filename="submission_ledger.json"):
+        '''
+        mode:
+            "off" to disable the ledger (does not wipe any existing entries)
+            "store" to always submit and record the new runs (force resubmission)
+            "auto" to reuse recorded runs and submit and record the others
+        filename: the json file used to store the ledger
+        '''
+        self.mode = mode
+        self.lock = threading.Lock()
+
+        #store absolute path to ensure it is found regardless of current directory
+        self.absolute_path = os.path.join(os.getcwd(),filename)
+
+    def __bool__(self):
+        return self.mode != "off"
+
+    @staticmethod
+    def get_key(omex_hash,engine,version):
+        return f"{omex_hash}:{engine}:{version}"
+
+    def load(self):
+        if not os.path.isfile(self.absolute_path):
+            return {}
+        with open(self.absolute_path) as f:
+            return json.load(f)
+
+    def get_entry(self,omex_hash,engine,version):
+        '''
+        return the recorded run, or None if there is none or mode is not "auto"
+        '''
+        if self.mode != "auto":
+            return None
+
+        with self.lock:
+            return self.load().get(self.get_key(omex_hash,engine,version))
+
+    def set_entry(self,omex_hash,engine,version,result):
+        '''
+        record a finished run
+        '''
+        entry = {k: result.get(k) for k in ['response', 'view', 'download', 'logs', 'log_yml']}
+        entry['recorded'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+        with self.lock:
+            ledger = self.load()
+            ledger[self.get_key(omex_hash,engine,version)] = entry
+            tmp_path = f'{self.absolute_path}.tmp'
+            with open(tmp_path,'w') as fout:
+                json.dump(ledger, fout, indent=4)
+            os.replace(tmp_path, self.absolute_path)
+
 class MarkdownTable:
     '''
     helper class to accumulate rows of data with a header and optional summary row
@@ -1056,8 +2607,21 @@ class MarkdownTable:
     def print_col_lengths(self):
         print(' '.join([str(len(self.data[key])) for key in self.data]))
 
-    def write(self,fout,sep='|',end='\n'):
-        'write the markdown table to file'
+    def write(self,fout,sep='|',end='\n',page_size=None,group_by=None):
+        '''
+        write the markdown table to file
+        page_size: split the rows into pages of this many rows, written next to fout which becomes
+        an index page with the summary row and links to the pages (see write_markdown_pages)
+        group_by: key of the column whose values (see cell_tag) the rows are grouped by before paging
+        '''
+        if page_size:
+            header = [sep + sep.join(self.labels) + sep, sep + sep.join(['---' for x in self.labels]) + sep]
+            summary = sep + sep.join([ str(self.summary[key]) for key in self.keys ]) + sep if self.summary else None
+            rows = [sep + sep.join([ str(self.data[key][i]) for key in self.keys ]) + sep for i in range(self.n_rows())]
+            tags = [cell_tag(cell) for cell in self.data[group_by]] if group_by else None
+            write_markdown_pages(fout,header,summary,rows,tags=tags,page_size=page_size,end=end)
+            return
+
         fout.write(sep + sep.join(self.labels) + sep + end)
         fout.write(sep + sep.join(['---' for x in self.labels]) + sep + end)
         if self.summary:
@@ -1074,7 +2638,7 @@ class MarkdownTable:
 
         #dict to record frequency of each engine error type
         errors = {'other':0}
-        for pattern,error_tag in error_categories[engine].items():
+        for error_tag in error_categories[engine]:
             errors[error_tag] = 0
 
         for i in range(len(self.data[key])):
@@ -1086,19 +2650,9 @@ class MarkdownTable:
             error_str = safe_md_string(self.data[key][i])
 
             #category match the error message
-            cell_text = None
-            for pattern in error_categories[engine]:
-                if re.search(pattern,error_str):
-                    error_tag = error_categories[engine][pattern]
-                    errors[error_tag] += 1
-                    cell_text = self.make_fold(f"FAIL ({error_tag})",error_str,quote=True)
-                    break
-            
-            if not cell_text:
-                errors["other"] += 1
-                cell_text = self.make_fold(f"FAIL (other)",error_str,quote=True)
-            
-            self.data[key][i] = cell_text
+            error_tag = error_classifier.classify(engine,error_str)
+            errors[error_tag] += 1
+            self.data[key][i] = self.make_fold(f"FAIL ({error_tag})",error_str,quote=True)
 
         #generate summary counts by error category
         total_errors = sum([ count for _,count in errors.items() ])
@@ -1107,6 +2661,220 @@ class MarkdownTable:
         self.add_summary(key,summary_text)
 
 
+class StreamingMarkdownTable(MarkdownTable):
+    '''
+    MarkdownTable that writes each row to output_file as soon as the next row starts
+    so only the current row is held in memory however many rows the table has
+
+    column summaries are declared up front with count() and count_values()
+    (the streaming versions of add_count() and simple_summary()) and kept as running counters,
+    cells are formatted as they are written with transform() (the streaming transform_column())
+    counters see the cell values before any transform, as when summarising before transform_column()
+
+    close() writes the summary row into the space reserved (reserve bytes) below the header and moves
+    the rows up (or down, for a longer summary) so no padding is left in the file,
+    or writes it to summary_file if one is given, eg to prepend to the table later
+    write(fout) closes the table and copies the finished output_file into fout, as MarkdownTable.write
+
+    with page_size the rows go to pages of that many rows next to output_file, one set of pages
+    per value (see cell_tag) of the group_by column, and close() writes output_file as the index page
+    with the preface, summary row and links to the pages (see write_markdown_pages)
+    '''
+
+    def __init__(self,labels:str,keys:str,output_file,preface='',summary_file=None,reserve=4096,
+                 page_size=None,group_by=None,splitter='|',PASS="pass",FAIL="FAIL",NA="NA"):
+        super().__init__(labels,keys,splitter=splitter,PASS=PASS,FAIL=FAIL,NA=NA)
+        self.output_file = output_file
+        self.summary_file = summary_file
+        self.reserve = reserve
+        self.counters = {}
+        self.transforms = {}
+        self.rows_written = 0
+        self.closed = False
+
+        self.page_size = page_size
+        self.group_by = group_by
+        self.preface = preface
+        self.header = ['|' + '|'.join(self.labels) + '|', '|' + '|'.join(['---' for x in self.labels]) + '|']
+        self.open_pages = {} # tag: [open file, number of rows]
+        self.pages = [] # (tag, path, number of rows) of the finished pages
+        if page_size:
+            return
+
+        self.fout = open(output_file,'w+b')
+        self.write_line(preface,end='')
+        for line in self.header:
+            self.write_line(line)
+        self.summary_offset = self.fout.tell()
+        if not summary_file:
+            self.fout.write(b' ' * reserve + b'\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        self.close()
+
+    def write_line(self,line,end='\n'):
+        self.fout.write((line + end).encode('utf-8'))
+
+    def count(self,key,func,format='n={count}'):
+        'streaming add_count: count the cells for which the function is true'
+        assert key in self.keys
+        self.counters[key] = {'func':func,'format':format,'count':0}
+
+    def count_values(self,key):
+        'streaming simple_summary: count how many cells contain each distinct value'
+        assert key in self.keys
+        self.counters[key] = {'func':None,'counts':defaultdict(int)}
+
+    def count_matches(self,key,patterns,format='{summary}',func=None):
+        '''
+        streaming regex_summary: count how many cells match each pattern
+        transform cell contents with optional callback function
+        '''
+        assert key in self.keys
+        self.counters[key] = {'func':None,'patterns':patterns,'format':format,'callback':func,'counts':defaultdict(int)}
+
+    def transform(self,key,func=None):
+        'streaming transform_column: pass each cell through the function (format_cell by default) as it is written'
+        assert key in self.keys
+        self.transforms[key] = func or self.format_cell
+
+    def new_row(self,vars={}):
+        'write out the current row and start the next one'
+        self.flush_row()
+        super().new_row(vars)
+
+    def n_rows(self):
+        'return number of data rows, written or current'
+        return self.rows_written + len(self.data[self.keys[0]])
+
+    def flush_row(self):
+        'update the counters with the current row and write it to file'
+        if len(self.data[self.keys[0]]) == 0:
+            return
+
+        row = {key:self.data[key][-1] for key in self.keys}
+        group = cell_tag(row[self.group_by]) if self.group_by else ''
+        for key,counter in self.counters.items():
+            cell = row[key]
+            value = str(cell[0]) if type(cell) == list else str(cell)
+            if counter['func']:
+                if counter['func'](cell):
+                    counter['count'] += 1
+            elif 'patterns' in counter:
+                match = "other"
+                for regex,tag in counter['patterns'].items():
+                    if re.search(regex,value):
+                        match = tag
+                        break
+                counter['counts'][match] += 1
+                if counter['callback']: row[key] = counter['callback'](key,cell,match)
+            else:
+                counter['counts'][value] += 1
+
+        for key,func in self.transforms.items():
+            row[key] = func(row[key])
+
+        line = '|' + '|'.join([ str(row[key]) for key in self.keys ]) + '|'
+        if self.page_size:
+            self.write_page_line(group,line)
+        else:
+            self.write_line(line)
+        self.rows_written += 1
+        self.data = {key:[] for key in self.keys}
+
+    def write_page_line(self,tag,line):
+        'append a row line to the current page of its group, starting a new page when that one is full'
+        if tag in self.open_pages and self.open_pages[tag][1] == self.page_size:
+            self.close_page(tag)
+        if tag not in self.open_pages:
+            path = page_file_name(self.output_file,len(self.pages) + len(self.open_pages) + 1)
+            self.open_pages[tag] = [open_markdown_page(path,self.output_file,self.header,tag),0]
+        self.open_pages[tag][0].write(line + '\n')
+        self.open_pages[tag][1] += 1
+
+    def close_page(self,tag):
+        page,n_rows = self.open_pages.pop(tag)
+        page.close()
+        self.pages.append((tag,page.name,n_rows))
+
+    def write(self,fout=None,sep='|',end='\n',page_size=None,group_by=None):
+        '''
+        close the table and copy output_file (the index page with page_size) into fout, unless fout is output_file
+        the separators and paging are the ones the table was created with, those given here are not used
+        '''
+        self.close()
+        if fout is None or os.path.abspath(getattr(fout,'name','')) == os.path.abspath(self.output_file):
+            return
+        with open(self.output_file,encoding='utf-8') as f:
+            shutil.copyfileobj(f,fout)
+
+    def shift_rows(self,start,delta,chunk_size=64*1024):
+        'move the bytes of the file from start to its end by delta bytes, truncating it if they move up'
+        self.fout.seek(0,os.SEEK_END)
+        end = self.fout.tell()
+        if delta < 0:
+            position = start
+            while position < end:
+                self.fout.seek(position)
+                chunk = self.fout.read(chunk_size)
+                self.fout.seek(position + delta)
+                self.fout.write(chunk)
+                position += len(chunk)
+            self.fout.truncate(end + delta)
+        elif delta > 0:
+            position = end
+            while position > start:
+                size = min(chunk_size,position - start)
+                self.fout.seek(position - size)
+                chunk = self.fout.read(size)
+                self.fout.seek(position - size + delta)
+                self.fout.write(chunk)
+                position -= size
+
+    def close(self):
+        'write the last row and the summary row, then close the file'
+        if self.closed:
+            return
+        self.closed = True
+        self.flush_row()
+
+        for key,counter in self.counters.items():
+            if counter['func']:
+                self.add_summary(key,counter['format'].format(count=counter['count']))
+            elif 'patterns' in counter:
+                summary = ' '.join([f'n_{tag}={counter["counts"][tag]}' for tag in counter['counts']])
+                self.add_summary(key,counter['format'].format(summary=summary))
+            else:
+                self.add_summary(key,self.generate_summary(counter['counts']))
+
+        summary_line = ''
+        if self.summary:
+            summary_line = '|' + '|'.join([ str(self.summary[key]) for key in self.keys ]) + '|'
+
+        if self.page_size:
+            for tag in list(self.open_pages):
+                self.close_page(tag)
+            with open(self.output_file,'w',encoding='utf-8') as fout:
+                fout.write(self.preface)
+                write_markdown_index(fout,self.header,summary_line,self.pages)
+            return
+
+        if self.summary_file:
+            with open(self.summary_file,'w',encoding='utf-8') as f:
+                f.write(summary_line + '\n')
+        else:
+            # the reserved line is reserve spaces and a newline, without a summary it is removed
+            encoded = (summary_line + '\n').encode('utf-8') if summary_line else b''
+            self.shift_rows(self.summary_offset + self.reserve + 1,len(encoded) - self.reserve - 1)
+            self.fout.seek(self.summary_offset)
+            self.fout.write(encoded)
+
+        self.fout.close()
+
+
 def safe_md_string(value):
     '''
     make a string safe to insert into markdown table
@@ -1114,40 +2882,184 @@ def safe_md_string(value):
 
     return str(value).replace("\n"," ").replace("\r","").replace("\t"," ").replace("   "," ").replace("  "," ")
 
-import time
+def cell_tag(cell):
+    '''
+    short value of a table cell used to group rows: the first item of a [summary, details] cell,
+    the summary of a folded <details> cell, otherwise the cell as a string
+    '''
+    if type(cell) == list:
+        return str(cell[0])
+    cell = str(cell)
+    if cell.startswith('<details><summary>'):
+        return cell[len('<details><summary>'):cell.find('</summary>')]
+    return cell
+
+def count_tags(cells):
+    'summary cell counting the rows of each outcome of a column, eg "n_PASS=20 n_FAIL=3", using the last word of each cell_tag'
+    counts = defaultdict(int)
+    for cell in cells:
+        tag = cell_tag(cell).split()
+        counts[tag[-1] if tag else ''] += 1
+    return ' '.join([f'n_{tag}={counts[tag]}' for tag in sorted(counts) if tag])
+
+def page_file_name(index_file, n):
+    'path of page n of the table whose index page is index_file'
+    stem, ext = os.path.splitext(index_file)
+    return f'{stem}_page{n}{ext or ".md"}'
+
+def open_markdown_page(path, index_file, header, tag, end='\n'):
+    'start a page of a paged table, returns the open file for the row lines'
+    fout = open(path, 'w', encoding='utf-8')
+    fout.write(f'[Back to the summary]({os.path.basename(index_file)})' + end + end)
+    if tag:
+        fout.write(f'### {tag}' + end + end)
+    for line in header:
+        fout.write(line + end)
+    return fout
+
+def write_markdown_index(fout, header, summary, pages, end='\n'):
+    '''
+    write the index page of a paged table: the table header and summary row, then links to the pages
+    pages: list of (tag, path, number of rows), listed by tag
+    '''
+    if summary:
+        for line in header + [summary]:
+            fout.write(line + end)
+        fout.write(end)
+
+    by_tag = defaultdict(list)
+    for tag, path, n_rows in pages:
+        by_tag[tag].append((path, n_rows))
+
+    for tag in sorted(by_tag):
+        links = ', '.join([f'[page {i + 1}]({os.path.basename(path)}) ({n_rows} rows)' for i, (path, n_rows) in enumerate(by_tag[tag])])
+        total = sum([n_rows for path, n_rows in by_tag[tag]])
+        fout.write((f'- **{tag}** ({total} rows): ' if tag else '- ') + links + end)
 
-def download_file_from_link(engine, download_link, output_file='results.zip', max_wait_time=600, wait_time=2):
+def write_markdown_pages(fout, header, summary, rows, tags=None, page_size=REPORT_PAGE_SIZE, end='\n'):
+    '''
+    split a markdown table into pages of at most page_size rows, with fout (an open file) as the index page
+    header: the label and --- lines, summary: the summary row line or None, rows: the row lines
+    tags: optional group of each row (eg the cell_tag of a status column), rows are grouped by tag before paging
+    pages are written next to the index as {index}_page{n}.md, returns their paths
+    '''
+    groups = defaultdict(list)
+    for i, row in enumerate(rows):
+        groups[tags[i] if tags else ''].append(row)
+
+    pages = []
+    for tag in sorted(groups):
+        for start in range(0, len(groups[tag]), page_size):
+            path = page_file_name(fout.name, len(pages) + 1)
+            page_rows = groups[tag][start:start + page_size]
+            with open_markdown_page(path, fout.name, header, tag, end=end) as page:
+                for row in page_rows:
+                    page.write(row + end)
+            pages.append((tag, path, len(page_rows)))
+
+    write_markdown_index(fout, header, summary, pages, end=end)
+    return [path for tag, path, n_rows in pages]
+
+def download_file_from_link(engine, download_link, output_file='results.zip', max_wait_time=600, wait_time=2, stats=None):
     """
     Function to download a file from a given URL.
 
     Parameters:
     download_link (str): The URL of the file to download.
     output_file (str): The name of the file to save the download as. Defaults to 'results.zip'.
-    max_wait_time (int): The maximum time to wait for the file to be ready to download. Defaults to 300 seconds.
+        Can also be an open binary file object, which is written to and left open.
+    max_wait_time (int): The maximum time to wait for the file to be ready to download. Defaults to 600 seconds.
     wait_time (int): The time to wait between checks if the file is ready to download. Defaults to 2 seconds.
+    stats (dict): Optional dict that is filled with the bytes downloaded, seconds taken and attempts made.
 
     Returns:
-    bool: True if the file was downloaded successfully, False otherwise.
+    The absolute path of the downloaded file, or output_file if it is a file object.
+    Raises HTTPError if the file is not ready within max_wait_time.
     """
 
     start_time = time.time()
+    response = wait_for_download(download_link, max_wait_time, wait_time)
+
+    if response is None:
+        print(f'Failed to download {engine} results.')
+        raise HTTPError(f'Failed to download {engine} results.') 
+
+    print(f'Downloading {engine} results...')
+    if hasattr(output_file, 'write'):
+        n_bytes, attempts = stream_download(download_link, output_file, response)
+        filepath = output_file
+    else:
+        with open(output_file, 'wb') as f:
+            n_bytes, attempts = stream_download(download_link, f, response)
+        filepath = os.path.abspath(output_file)
+
+    if stats is not None:
+        stats.update({"bytes": n_bytes, "seconds": round(time.time() - start_time, 3), "attempts": attempts})
+
+    return filepath
+
+def wait_for_download(download_link, max_wait_time=600, wait_time=2):
+    '''
+    wait until the download link stops returning 404, without downloading the body
+    HEAD requests are used, falling back to streamed GETs if the server does not support HEAD
+    returns the open streamed GET response if one was needed (to be reused for the download),
+    True if the link is ready, or None if it is not ready within max_wait_time or returns an error
+    '''
+
+    start_time = time.time()
+    use_head = True
 
     while True:
-        response = requests.get(download_link)
+        if use_head:
+            response = requests.head(download_link, allow_redirects=True)
+            if response.status_code in [405, 501]:
+                use_head = False
+                continue
+        else:
+            response = requests.get(download_link, stream=True)
+
+        if response.status_code == 200:
+            return True if use_head else response
+        response.close()
         if response.status_code != 404 or time.time() - start_time > max_wait_time:
-            break
+            return None
         time.sleep(wait_time)
 
-    if response.status_code == 200:
-        print(f'Downloading {engine} results...')
-        with requests.get(download_link, stream=True) as r:
-            with open(output_file, 'wb') as f:
-                shutil.copyfileobj(r.raw, f)
-        filepath = os.path.abspath(output_file)
-        return filepath
-    else:
-        print(f'Failed to download {engine} results.')
-        raise HTTPError(f'Failed to download {engine} results.') 
+def stream_download(download_link, f, response=True, max_attempts=DOWNLOAD_MAX_ATTEMPTS):
+    '''
+    stream download_link into the binary file object f, resuming with a Range request after a failure
+    response is an already open streamed response to read first, or True to open a new one
+    failed reconnects (connection errors, timeouts and 5xx responses) count as attempts too,
+    with a wait of DOWNLOAD_RETRY_WAIT seconds doubling after each failed attempt
+    returns the number of bytes written and the number of attempts
+    '''
+
+    start = f.tell()
+    written = 0
+    for attempt in range(1, max_attempts + 1):
+        try:
+            if response is True:
+                headers = {'Range': f'bytes={written}-'} if written else {}
+                response = requests.get(download_link, stream=True, headers=headers)
+                response.raise_for_status()
+                if written and response.status_code != 206:
+                    # the server ignored the range, start again from the beginning
+                    f.seek(start)
+                    f.truncate()
+                    written = 0
+            with response:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    written += len(chunk)
+            return written, attempt
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout, HTTPError) as e:
+            client_error = isinstance(e, HTTPError) and e.response is not None and e.response.status_code < 500
+            if client_error or attempt == max_attempts:
+                raise
+            print(f'Download interrupted after {written} bytes, resuming: {e}')
+            response = True
+            time.sleep(DOWNLOAD_RETRY_WAIT * 2**(attempt - 1))
 
 def create_results_table(results, sbml_filepath, sedml_filepath, output_dir):
     """
@@ -1166,14 +3078,22 @@ def create_results_table(results, sbml_filepath, sedml_filepath, output_dir):
 
     links = ['view', 'download', 'logs']
     for e in results.keys():
-        results[e].update(process_log_yml_dict(results[e]["log_yml"]))
+        results[e].update(process_log_yml_dict(results[e]["log_yml"], e))
         if "detailed_error_log" in results[e].keys():
             if results[e]["detailed_error_log"] != {}:
                 results[e]['status']  = results[e]["detailed_error_log"]['status']
                 results[e]['error_message'] = results[e]["detailed_error_log"]['error_message']
+        # containers stopped at the timeout or killed for running out of memory
+        if results[e].get("container", {}).get("status") in ['TIMEOUT', 'OOMKilled']:
+            results[e]['status'] = 'FAIL'
+            results[e]['error_message'] = results[e]["container"]['message']
+            results[e]['exception_type'] = results[e]["container"]['status']
+            results[e]['error_category'] = results[e]["container"]['status']
         if any([l in results[e].keys() for l in links]):
             results[e]['links'] = '<br>'.join([f'{create_hyperlink(results[e][k], title=k)}' for k in results[e].keys() if k in links])
         results[e]['name'] = ENGINES[e]['name']
+        if results[e].get("telemetry"):
+            results[e].update(format_telemetry(results[e]["telemetry"]))
 
     results_table = pd.DataFrame.from_dict(results).T
     results_table.rename(columns={"status": PASS_FAIL, "error_message": ERROR, "exception_type": TYPE}, inplace=True)
@@ -1181,78 +3101,99 @@ def create_results_table(results, sbml_filepath, sedml_filepath, output_dir):
     results_table.index.name =  ENGINE
     results_table.reset_index(inplace=True)
 
+    engines = list(results_table[ENGINE])
+
     # Error
-    results_table[ERROR] = results_table.apply(lambda x: None if x[PASS_FAIL] == x[ERROR] else x[ERROR], axis=1)
-    results_table[ERROR] = results_table[ERROR].apply(lambda x: ansi_to_html(x))
+    results_table[ERROR] = [ansi_to_html(None if status == error else error, max_length=ERROR_MAX_LENGTH, fold=True)
+                            for status, error in zip(results_table[PASS_FAIL], results_table[ERROR])]
 
-    results_table[PASS_FAIL] = results_table[PASS_FAIL].apply(lambda x: f'{fail_html}' if x == 'FAIL' \
-                                                                        else f'{pass_html}' if x == 'pass'
-                                                                        else f'{warning_html}' if x == 'WARNING'
-                                                                        else x)
+    status_html = {'FAIL': fail_html, 'pass': pass_html, 'WARNING': warning_html}
+    results_table[PASS_FAIL] = [status_html.get(x, x) for x in results_table[PASS_FAIL]]
                                                           
-    # d1 plot clickable link
-    results_table[D1] = results_table[ENGINE].apply(lambda x: d1_plots_dict(output_dir).get(x, None))
-    results_table[D1] = results_table[D1].apply(lambda x: create_hyperlink(x,title='plot'))
-
-    for e in ENGINES.keys():
+    # d1 plot clickable link, scanning the plot folder once
+    d1_plots = d1_plots_dict(output_dir)
+    results_table[D1] = results_table[ENGINE].apply(lambda x: d1_plots.get(x, None))
+    results_table[D1] = results_table[D1].apply(lambda x: create_hyperlink(x,title=plot_preview_html(x, output_dir)))
+
+    compatibility_html = {'pass': pass_html, 'unsure': unsure_html}
+    compatibility = {}
+    for e in engines:
         compatibility_content = check_file_compatibility_test(e, sbml_filepath, sedml_filepath)
-        if compatibility_content[0] == 'pass':
-            results_table.loc[results_table[ENGINE] == e, COMPAT] = collapsible_content(compatibility_content[1], title=f'{pass_html}')
-        elif compatibility_content[0] == 'unsure':
-            results_table.loc[results_table[ENGINE] == e, COMPAT] = collapsible_content(compatibility_content[1], title=f'{unsure_html}')
-        else:
-            results_table.loc[results_table[ENGINE] == e, COMPAT] = collapsible_content(compatibility_content[1], title=f'{fail_html}')
+        compatibility[e] = collapsible_content(compatibility_content[1], title=compatibility_html.get(compatibility_content[0], fail_html))
 
     # add xfail to engines that do not support sbml
-    sbml_incompatible_ENGINES = [e for e in ENGINES.keys() if 'sbml' not in ENGINES[e]['formats'][0]]
-    for e in sbml_incompatible_ENGINES:
-        engine_name = ENGINES[e]['name']
-        unique_compatible_filetpyes_strings = ', '.join([TYPES[i] for i in ENGINES[e]['formats'][0] if i in list(TYPES.keys())])
-        compatibility = (f"Only {unique_compatible_filetpyes_strings} are compatible with {engine_name}.")
-        compatibility_content =  f'EXPECTED FAIL<br><br>{compatibility}'
-        results_table.loc[results_table[ENGINE] == e, COMPAT] = collapsible_content(compatibility_content, title=f'{xfail_html}')
-        results_table.loc[results_table[ENGINE] == e, PASS_FAIL] = f'{xfail_html}' 
-
-    for e in results_table[ENGINE]:
+    pass_fail = dict(zip(engines, results_table[PASS_FAIL]))
+    for e in engines:
+        if 'sbml' not in ENGINES[e]['formats'][0]:
+            engine_name = ENGINES[e]['name']
+            unique_compatible_filetpyes_strings = ', '.join([TYPES[i] for i in ENGINES[e]['formats'][0] if i in TYPES])
+            compatibility_content = f'EXPECTED FAIL<br><br>Only {unique_compatible_filetpyes_strings} are compatible with {engine_name}.'
+            compatibility[e] = collapsible_content(compatibility_content, title=f'{xfail_html}')
+            pass_fail[e] = f'{xfail_html}'
+    results_table[COMPAT] = [compatibility[e] for e in engines]
+    results_table[PASS_FAIL] = [pass_fail[e] for e in engines]
+
+    columns = results_table.columns
+    links_error = []
+    for row in results_table.to_dict('records'):
         links = ""
         error_message = ""
         error_type = ""
         expected_fail = ""
+        cached = ""
+        error_category = ""
 
-        if results_table.loc[results_table[ENGINE] == e, PASS_FAIL].values[0] == f'{xfail_html}':
+        if row[PASS_FAIL] == f'{xfail_html}':
             expected_fail = f'EXPECTED FAIL<br><br>'
-        if len(results_table.loc[results_table[ENGINE] == e, ERROR].values[0]) > 1:
-            error_message = f'ERROR MESSAGE:<br>{results_table.loc[results_table[ENGINE] == e, ERROR].values[0]}<br><br>'  
-        if "links" in results_table.columns:
-            links = results_table.loc[results_table[ENGINE] == e, "links"].values[0]
-            links = f'{links}<br><br>'
-        if TYPE in results_table.columns:
-            if len(results_table.loc[results_table[ENGINE] == e, TYPE].values[0])>1:
-                error_type = f'ERROR TYPE:<br>{results_table.loc[results_table[ENGINE] == e, TYPE].values[0]}'
-
-        links_error = f'{expected_fail}{links}{error_message}{error_type}'
-        results_table.loc[results_table[ENGINE] == e, "links_error"] = links_error
+        if "cache" in columns and row["cache"] == 'hit':
+            cached = f'CACHED RESULT<br><br>'
+        if len(row[ERROR]) > 1:
+            error_message = f'ERROR MESSAGE:<br>{row[ERROR]}<br><br>'  
+        if "links" in columns:
+            links = f'{row["links"]}<br><br>'
+        if isinstance(row.get("error_category"), str) and row["error_category"] not in ["", "other"]:
+            error_category = f'ERROR CATEGORY:<br>{row["error_category"]}<br><br>'
+        if TYPE in columns and len(row[TYPE]) > 1:
+            error_type = f'ERROR TYPE:<br>{row[TYPE]}'
+
+        links_error.append(f'{expected_fail}{cached}{links}{error_category}{error_message}{error_type}')
+    results_table["links_error"] = links_error
 
     # add links as collapsible content to pass / fail column
-    for e in results_table[ENGINE]:
-        title = results_table.loc[results_table[ENGINE] == e, PASS_FAIL].values[0]
-        content = results_table.loc[results_table[ENGINE] == e, "links_error"].values[0]
-        results_table.loc[results_table[ENGINE] == e, PASS_FAIL] = collapsible_content(content, title)
-        results_table.loc[results_table[ENGINE] == e, "name"] = collapsible_content(content=f'{ENGINES[e]["url"]}<br>{ENGINES[e]["status"]}', title=f'{ENGINES[e]["name"]}')
+    results_table[PASS_FAIL] = [collapsible_content(content, title) for content, title in zip(links_error, results_table[PASS_FAIL])]
+    results_table["name"] = [collapsible_content(content=f'{ENGINES[e]["url"]}<br>{ENGINES[e]["status"]}', title=f'{ENGINES[e]["name"]}') for e in engines]
         
     return results_table
 
-def process_log_yml_dict(log_yml_dict):
+def format_telemetry(telemetry):
+    '''
+    format a local run's telemetry dict for the results table
+    returns a dict of WALL_TIME, CPU_TIME and PEAK_MEMORY values, empty strings where not recorded
+    '''
+
+    def fmt(value, scale=1):
+        return '' if value is None else f'{value / scale:.1f}'
+
+    return {WALL_TIME: fmt(telemetry.get('wall_seconds')),
+            CPU_TIME: fmt(telemetry.get('cpu_seconds')),
+            PEAK_MEMORY: fmt(telemetry.get('peak_memory_bytes'), scale=1024**2)}
+
+def process_log_yml_dict(log_yml_dict, engine=None):
+    '''
+    status, error message and exception type of a biosimulators log.yml dict
+    error_category tags failures with the engine's error_categories (empty without an engine or error)
+    '''
     status = ""
     error_message = ""
     exception_type = ""
 
     if log_yml_dict == {}:
-         return {"status":"FAIL", "error_message":"Error unknown. The log.yml containing error information was not found.","exception_type": ""}
+         return {"status":"FAIL", "error_message":"Error unknown. The log.yml containing error information was not found.","exception_type": "", "error_category": ""}
 
-    log_yml_str = str(log_yml_dict)
     if log_yml_dict['status'] == 'SUCCEEDED':
         status = 'pass'
+        # outputs moved out of the results file are read back for this check
+        log_yml_str = str(expand_log_outputs(log_yml_dict))
         # to deal with cases like amici where the d1 plot max x is half the expected value
         pattern_max_number_of_steps = "simulation failed: Reached maximum number of steps"
         pattern_match = re.search(pattern_max_number_of_steps, log_yml_str)
@@ -1271,44 +3212,51 @@ def process_log_yml_dict(log_yml_dict):
     else:
         status = None
 
-    return {"status":status, "error_message":error_message,"exception_type": exception_type}
+    error_category = ""
+    if engine and error_message:
+        error_category = error_classifier.classify(engine, error_message)
+
+    return {"status":status, "error_message":error_message,"exception_type": exception_type, "error_category": error_category}
 
 
 def run_biosimulators_remotely(engine_keys,
                                sedml_file_name, 
                                sbml_file_name, 
                                d1_plots_remote_dir,  
-                               test_folder='tests'):
+                               test_folder='tests',
+                               ledger=None,
+                               download_archive='auto',
+                               reports=None):
     
-    """ run with directory pointing towards the location of the sedml and sbml files"""
+    """ 
+    run with directory pointing towards the location of the sedml and sbml files
+    ledger is an optional SubmissionLedger used to reuse earlier runs of the same archive
+    download_archive is "auto" to only download the results archives of successful runs
+    (the other runs' logs come from the logs endpoint) or "always" to download them all
+    reports is an optional utils.reports.ReportStore the runs' reports are added to
+    """
+
+    if download_archive not in ['auto', 'always']:
+        raise ValueError(f'download_archive must be "auto" or "always", not {download_archive}')
     
     engines = {k: v for k, v in ENGINES.items() if k in engine_keys}
 
     remote_output_dir = 'remote_results'
     remote_output_dir = os.path.join(test_folder, remote_output_dir)
 
-    results_remote = dict()
-    for e in engines.keys():
-        results_remote[e] = run_biosimulators_remote(e, sedml_file_name, sbml_file_name)
-        results_remote[e]['response']  = results_remote[e]['response'].status_code
-        
-    extract_dir_dict = dict()
-    for e, link in results_remote.items():
-        try:
-            extract_dir = get_remote_results(e, link["download"], remote_output_dir)
-        except HTTPError as emessage:
-            results_remote[e] = ["FAIL", str(emessage), type(emessage).__name__]
-            continue
-        extract_dir_dict[e] = extract_dir
-
-    for e, extract_dir in extract_dir_dict.items():
-        log_yml_path = find_file_in_dir('log.yml', extract_dir)[0]
-        with open(log_yml_path) as f:
-            log_yml_dict = yaml.safe_load(f)
-        results_remote[e]["log_yml"] = log_yml_dict
+    # size each engine's request from the model and the engine's earlier runs of it
+    stats = model_statistics(sbml_file_name, sedml_file_name)
+    history = load_engine_history(test_folder)
+    resources = {e: size_remote_resources(stats, history.get(e)) for e in engines.keys()}
 
-    file_paths = find_files(remote_output_dir, '.pdf')
-    move_d1_files(file_paths, d1_plots_remote_dir)
+    # one archive is shared by all the submissions
+    omex_filepath = create_omex(sedml_file_name, sbml_file_name)
+    try:
+        results_remote = asyncio.run(run_engines_remote_async(list(engines.keys()), omex_filepath, remote_output_dir, d1_plots_remote_dir,
+                                                              ledger, download_archive, resources, reports))
+    finally:
+        if os.path.exists(omex_filepath):
+            os.remove(omex_filepath)
 
     # remove the remote results directory
     if os.path.exists(remote_output_dir):
@@ -1317,11 +3265,178 @@ def run_biosimulators_remotely(engine_keys,
 
     return results_remote
 
+class RequestRateLimiter:
+    '''
+    spaces out requests made from concurrent asyncio tasks
+    wait() returns once at least min_interval seconds have passed since the previous request
+    '''
+
+    def __init__(self, min_interval=REMOTE_MIN_REQUEST_INTERVAL):
+        self.min_interval = min_interval
+        self.next_time = 0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            delay = self.next_time - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_time = loop.time() + self.min_interval
+
+async def run_engine_remote_async(engine, omex_filepath, remote_output_dir, d1_plots_remote_dir, limiter,
+                                  ledger=None, omex_hash=None, download_archive='auto', resources=None, reports=None):
+    '''
+    submit the omex archive for one engine, poll the run status with exponential backoff
+    then fetch the log, download the results and move the d1 plots as soon as the run ends
+    the blocking requests calls, plot storing and report reading run in the event loop's default thread pool
+
+    ledger: optional SubmissionLedger, a run recorded for the same omex_hash, engine and
+    simulator version is downloaded again instead of submitting the archive
+    download_archive: "auto" fetches the log from the logs endpoint first and only downloads the
+    results archive (for the plots) if the run succeeded, "always" always downloads it
+    resources: optional cpus, memory and maxTime to request, recorded in the result
+    reports: optional utils.reports.ReportStore the run's reports are added to
+    '''
+
+    loop = asyncio.get_running_loop()
+
+    version = await loop.run_in_executor(None, get_simulator_version, engine)
+    entry = ledger.get_entry(omex_hash, engine, version) if ledger else None
+    if entry:
+        # only reuse runs that biosimulations still knows about
+        await limiter.wait()
+        try:
+            status = await loop.run_in_executor(None, get_remote_run_status, entry['view'])
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            status = ''
+        if status not in ['SUCCEEDED', 'FAILED']:
+            entry = None
+
+    while True:
+        if entry:
+            print(f'Reusing the earlier {engine} {version} run {entry["view"]}')
+            result = {k: entry[k] for k in ['response', 'view', 'download', 'logs']}
+            result['ledger'] = 'reused'
+        else:
+            await limiter.wait()
+            result = await loop.run_in_executor(None, submit_omex_remote, engine, omex_filepath, version, resources)
+            result['response'] = result['response'].status_code
+            result['resources'] = resources or REMOTE_RESOURCES
+            status = await wait_for_remote_run(engine, result['view'], limiter)
+
+        # the structured log is enough for the table unless there are plots to collect
+        log_yml = entry.get('log_yml') if entry else None
+        if log_yml is None and status in ['SUCCEEDED', 'FAILED']:
+            await limiter.wait()
+            try:
+                log_yml = await loop.run_in_executor(None, get_remote_log, result['logs'])
+            except (requests.exceptions.RequestException, ValueError) as emessage:
+                print(f'Failed to get the {engine} log, downloading the results archive instead: {emessage}')
+
+        extract_dir = None
+        if download_archive != 'always' and log_yml and log_yml.get('status') != 'SUCCEEDED':
+            print(f'{engine} remote run {log_yml.get("status")}, not downloading the results archive')
+            break
+
+        await limiter.wait()
+        download_stats = {}
+        try:
+            extract_dir = await loop.run_in_executor(None, get_remote_results, engine, result['download'], remote_output_dir, reports is not None, download_stats)
+        except HTTPError as emessage:
+            if entry:
+                # the earlier run's results are no longer available, submit again
+                entry = None
+                continue
+            if not log_yml:
+                return ["FAIL", str(emessage), type(emessage).__name__]
+            print(f'Failed to download the {engine} results archive, using the log only: {emessage}')
+        break
+
+    result["log_yml"] = log_yml or {}
+    result["simulator_version"] = version
+    if extract_dir:
+        result['download_stats'] = download_stats
+        log_yml_paths = find_file_in_dir('log.yml', extract_dir)
+        if log_yml_paths:
+            with open(log_yml_paths[0]) as f:
+                result["log_yml"] = load_yaml(f)
+
+        # storing the plots, rendering their previews and reading the reports block, keep them off the event loop
+        file_paths = find_files(extract_dir, '.pdf')
+        await loop.run_in_executor(None, move_d1_files, file_paths, d1_plots_remote_dir)
+
+        if reports is not None:
+            await loop.run_in_executor(None, reports.add, 'remote', engine, extract_dir)
+
+    if ledger and not entry and status in ['SUCCEEDED', 'FAILED']:
+        ledger.set_entry(omex_hash, engine, version, result)
+
+    return result
+
+async def wait_for_remote_run(engine, view_link, limiter):
+    '''
+    poll the run status with exponential backoff until it has finished or REMOTE_MAX_WAIT_TIME passes
+    returns the last status seen
+    '''
+
+    loop = asyncio.get_running_loop()
+
+    start_time = loop.time()
+    interval = REMOTE_POLL_INTERVAL
+    status = ''
+    while status not in ['SUCCEEDED', 'FAILED'] and loop.time() - start_time < REMOTE_MAX_WAIT_TIME:
+        await asyncio.sleep(interval)
+        interval = min(interval * REMOTE_POLL_BACKOFF, REMOTE_POLL_MAX_INTERVAL)
+        await limiter.wait()
+        try:
+            status = await loop.run_in_executor(None, get_remote_run_status, view_link)
+        except (requests.exceptions.RequestException, ValueError, KeyError) as emessage:
+            print(f'Failed to get the {engine} run status, retrying: {emessage}')
+    print(f'{engine} remote run status: {status or "unknown"} after {loop.time() - start_time:.0f} s')
+
+    return status
+
+async def run_engines_remote_async(engine_keys, omex_filepath, remote_output_dir, d1_plots_remote_dir, ledger=None, download_archive='auto', resources=None,
+                                   reports=None):
+    '''
+    run all the engines remotely at the same time, returns a dict of results keyed by engine
+    resources: optional dict of engine to the resources to request, see size_remote_resources
+    reports: optional utils.reports.ReportStore the runs' reports are added to
+    '''
+
+    limiter = RequestRateLimiter()
+    omex_hash = omex_content_hash(omex_filepath) if ledger else None
+    resources = resources or {}
+    results = await asyncio.gather(*[run_engine_remote_async(e, omex_filepath, remote_output_dir, d1_plots_remote_dir, limiter,
+                                                             ledger, omex_hash, download_archive, resources.get(e), reports)
+                                     for e in engine_keys], return_exceptions=True)
+
+    # one engine's error is recorded as its result instead of aborting the other engines
+    results_remote = {}
+    for engine, result in zip(engine_keys, results):
+        if isinstance(result, Exception):
+            print(f'{engine} remote run raised {type(result).__name__}: {result}')
+            result = ["FAIL", str(result), type(result).__name__]
+        elif isinstance(result, BaseException):
+            raise result
+        results_remote[engine] = result
+
+    return results_remote
+
 def run_biosimulators_locally(engine_keys,
                               sedml_file_name, 
                               sbml_file_name, 
                               d1_plots_local_dir, 
-                              test_folder='tests'):
+                              test_folder='tests',
+                              cache=None,
+                              backend=None,
+                              reports=None):
+    """
+    run each engine locally, cache is an optional LocalResultCache
+    backend optionally overrides the engines' backends, eg "docker-warm" to reuse warm containers
+    reports is an optional utils.reports.ReportStore the runs' reports are added to
+    """
     
     engines = {k: v for k, v in ENGINES.items() if k in engine_keys}
     results_local = {}
@@ -1333,7 +3448,9 @@ def run_biosimulators_locally(engine_keys,
         print('Running ' + e)
         local_output_dir_e = os.path.abspath(os.path.join(local_output_dir, e))
         print(local_output_dir_e)
-        results_local[e] = run_biosimulators_docker(e, sedml_file_name, sbml_file_name, output_dir=local_output_dir_e)
+        results_local[e] = run_biosimulators_docker(e, sedml_file_name, sbml_file_name, output_dir=local_output_dir_e, cache=cache, backend=backend)
+        if reports is not None:
+            reports.add('local', e, local_output_dir_e)
 
     file_paths = find_files(local_output_dir, '.pdf')
     print('file paths:', file_paths)
@@ -1352,7 +3469,19 @@ def create_combined_results_table(results_remote,
                                   sbml_file_name, 
                                   d1_plots_local_dir, 
                                   d1_plots_remote_dir,
-                                  test_folder='tests'):
+                                  test_folder='tests',
+                                  telemetry=False,
+                                  page_size=None,
+                                  group_by=None,
+                                  agreement=None):
+    '''
+    telemetry: if True add the local runs' wall time, CPU time and peak memory columns
+    agreement: optional {"remote": {engine: cell}, "local": {engine: cell}} of the runs' report agreement
+    (see utils.reports.ReportStore.agreement_cells), added as an AGREEMENT column per run
+    page_size: split the table into pages of this many rows, the markdown file becomes an index page
+    linking to them (see write_markdown_pages)
+    group_by: column whose values (see cell_tag) the rows are grouped by before paging, eg f"{PASS_FAIL} (L)"
+    '''
 
     suffix_remote = ' (R)'
     suffix_local = ' (L)'
@@ -1361,15 +3490,17 @@ def create_combined_results_table(results_remote,
     path_to_results_remote = os.path.join(test_folder, 'results_remote.json')
     path_to_results_local = os.path.join(test_folder, 'results_local.json')
 
-    with open(path_to_results_remote, 'w') as f:
-        json.dump(results_remote, f, indent=4)
-    with open(path_to_results_local, 'w') as f:
-        json.dump(results_local, f, indent=4)
+    save_results(results_remote, path_to_results_remote)
+    save_results(results_local, path_to_results_local)
     
     # Create results tables for remote and local results
     results_table_remote = create_results_table(results_remote, sbml_file_name, sedml_file_name, d1_plots_remote_dir)
     results_table_local = create_results_table(results_local, sbml_file_name, sedml_file_name, d1_plots_local_dir)
 
+    if agreement is not None:
+        results_table_remote[AGREEMENT] = [agreement.get('remote', {}).get(e, '') for e in results_table_remote[ENGINE]]
+        results_table_local[AGREEMENT] = [agreement.get('local', {}).get(e, '') for e in results_table_local[ENGINE]]
+
     shared_columns = [ENGINE, COMPAT, 'name']
     results_table_remote.columns = [f"{col}{suffix_remote}" if col not in shared_columns else col for col in results_table_remote.columns]
     results_table_local.columns = [f"{col}{suffix_local}" if col not in shared_columns else col for col in results_table_local.columns]
@@ -1385,6 +3516,17 @@ def create_combined_results_table(results_remote,
         f"{PASS_FAIL}{suffix_remote}", f"{PASS_FAIL}{suffix_local}", 
         f"{D1}{suffix_remote}", f"{D1}{suffix_local}"
     ]
+    if agreement is not None:
+        agreement_cols = [f"{AGREEMENT}{suffix_remote}", f"{AGREEMENT}{suffix_local}"]
+        combined_results[agreement_cols] = combined_results[agreement_cols].fillna('')
+        cols_order += agreement_cols
+    if telemetry:
+        telemetry_cols = [f"{col}{suffix_local}" for col in [WALL_TIME, CPU_TIME, PEAK_MEMORY]]
+        for col in telemetry_cols:
+            if col not in combined_results.columns:
+                combined_results[col] = ''
+        combined_results[telemetry_cols] = combined_results[telemetry_cols].fillna('')
+        cols_order += telemetry_cols
 
     combined_results = combined_results[cols_order]
 
@@ -1392,7 +3534,16 @@ def create_combined_results_table(results_remote,
     path_to_results = os.path.join(test_folder, 'results_compatibility_biosimulators.md')
     print('Saving results to:', path_to_results)
     with open(path_to_results, 'w', encoding='utf-8') as f:
-        f.write(combined_results.to_markdown(index=False))
+        if page_size:
+            lines = combined_results.to_markdown(index=False).split('\n')
+            tags = [cell_tag(cell) for cell in combined_results[group_by]] if group_by else None
+            # the index page keeps the outcome counts of the whole table
+            counted = [COMPAT] + [col for col in combined_results.columns if col.startswith(PASS_FAIL)]
+            summary = '| ' + ' | '.join([f'n={len(combined_results)}' if col == ENGINE else count_tags(combined_results[col]) if col in counted else ''
+                                         for col in combined_results.columns]) + ' |'
+            write_markdown_pages(f, lines[:2], summary, lines[2:], tags=tags, page_size=page_size)
+        else:
+            f.write(combined_results.to_markdown(index=False))
 
     print('Number of columns in md table:', len(combined_results.columns))
     print('Number of rows in md table:', len(combined_results))
@@ -1406,19 +3557,42 @@ def run_biosimulators_remotely_and_locally(engine_keys,
                                  sbml_file_name,
                                  d1_plots_remote_dir, 
                                  d1_plots_local_dir,
-                                 test_folder='tests'):
+                                 test_folder='tests',
+                                 local_cache=None,
+                                 ledger=None,
+                                 history=None,
+                                 reports=None):
+    '''
+    history is an optional utils.history.RunHistory recording both runs' outcomes for this model (the current folder)
+    reports is an optional (empty) utils.reports.ReportStore collecting both runs' reports, saved to
+    test_folder/reports.npz and scored for the table's agreement columns
+    '''
     
     results_remote = run_biosimulators_remotely(engine_keys,
                                     sedml_file_name=sedml_file_name, 
                                     sbml_file_name=sbml_file_name,
                                     d1_plots_remote_dir=d1_plots_remote_dir, 
-                                    test_folder=test_folder)
+                                    test_folder=test_folder,
+                                    ledger=ledger,
+                                    reports=reports)
     
     results_local = run_biosimulators_locally(engine_keys,
                                     sedml_file_name=sedml_file_name, 
                                     sbml_file_name=sbml_file_name,
                                     d1_plots_local_dir=d1_plots_local_dir, 
-                                    test_folder=test_folder)
+                                    test_folder=test_folder,
+                                    cache=local_cache,
+                                    reports=reports)
+
+    agreement = None
+    if reports is not None:
+        reports.save(os.path.join(test_folder, 'reports.npz'))
+        agreement = reports.agreement_cells()
+
+    if history:
+        model = os.path.relpath(os.getcwd(), os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        history.record(model, 'remote', results_remote)
+        history.record(model, 'local', results_local)
 
     results_table = create_combined_results_table(results_remote, 
                                     results_local, 
@@ -1426,6 +3600,7 @@ def run_biosimulators_remotely_and_locally(engine_keys,
                                     sbml_file_name=sbml_file_name,
                                     d1_plots_local_dir=d1_plots_local_dir,
                                     d1_plots_remote_dir=d1_plots_remote_dir, 
-                                    test_folder=test_folder)
+                                    test_folder=test_folder,
+                                    agreement=agreement)
     
     return results_table
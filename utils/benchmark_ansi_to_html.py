@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""
+time utils.ansi_to_html on the error messages and log.yml outputs in the results json files,
+against the previous implementation kept here as ansi_to_html_reference,
+checking both give the same html
+
+examples:
+    python -m utils.benchmark_ansi_to_html
+    python -m utils.benchmark_ansi_to_html --repeat 20 --max-length 20000
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import utils
+
+
+def parse_arguments():
+    "Parse command line arguments"
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark rendering engine error messages and logs as html"
+    )
+
+    parser.add_argument(
+        "--root",
+        action="store",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), ".."),
+        help="Folder searched for results_*.json files",
+    )
+
+    parser.add_argument(
+        "--repeat",
+        action="store",
+        type=int,
+        default=10,
+        help="Number of times every text is rendered",
+    )
+
+    parser.add_argument(
+        "--max-length",
+        action="store",
+        type=int,
+        default=10000,
+        help="Length at which long texts are folded in the truncated run",
+    )
+
+    return parser.parse_args()
+
+
+def ansi_to_html_reference(text):
+    'ansi_to_html before the conversions were made conditional'
+    if text != None:
+        text_message = re.findall(r'"([^"]*)"', text) 
+        if len(text_message) > 0:
+            text = text_message
+            text = bytes(text[0], "utf-8").decode("unicode_escape")
+        text = text.replace('|', '')
+        text = re.sub(r'<([^>]*)>', r'\1', text)
+        text = text.replace("\x1b[33m","")
+        text = text.replace("\x1b[31m","")
+        text = text.replace("\x1b[0m", "")
+        pattern = r'(<span style="[^"]*">[^.:]*)([.:])'
+        replacement = r'\1\2</span>'
+        text = re.sub(pattern, replacement, text, count=1)
+        text = text.replace('\r\n  - ', '</li><li>')
+        text = text.replace('\r\n', '<br>')
+        text = text.replace('\n', '<br>') 
+        text = text.replace('BioSimulatorsWarning:', '<br><br>BioSimulatorsWarning:<br><br>')
+        text = text.replace('warnings.warn(termcolor.colored(message, Colors.warning.value), category)', '<br>')
+        return text
+
+
+def collect_texts(root):
+    'return the error messages and log.yml outputs of all the results json files under root'
+
+    texts = []
+    for path in glob.glob(os.path.join(root, '**', 'results_*.json'), recursive=True):
+        results = utils.load_results(path, expand=True)
+        for engine, result in results.items():
+            if not isinstance(result, dict):
+                continue
+            log_yml = result.get('log_yml') or {}
+            texts.append(utils.process_log_yml_dict(log_yml)['error_message'])
+            if log_yml.get('output'):
+                texts.append(log_yml['output'])
+            if (result.get('detailed_error_log') or {}).get('error_message'):
+                texts.append(result['detailed_error_log']['error_message'])
+    return texts
+
+
+def benchmark(func, texts, repeat):
+    'render all the texts repeat times, returns the html of the last run and the seconds taken'
+
+    start_time = time.perf_counter()
+    for i in range(repeat):
+        html = [func(text) for text in texts]
+    return html, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    texts = collect_texts(args.root)
+    if not texts:
+        raise SystemExit(f'No results files found under {args.root}')
+    n_chars = sum([len(text) for text in texts])
+
+    reference_html, reference_seconds = benchmark(ansi_to_html_reference, texts, args.repeat)
+    html, seconds = benchmark(utils.ansi_to_html, texts, args.repeat)
+    assert html == reference_html, 'ansi_to_html output differs from the reference implementation'
+
+    truncated_html, truncated_seconds = benchmark(lambda text: utils.ansi_to_html(text, max_length=args.max_length),
+                                                  texts, args.repeat)
+    folded_html, folded_seconds = benchmark(lambda text: utils.ansi_to_html(text, max_length=args.max_length, fold=True),
+                                            texts, args.repeat)
+    n_folded = len([text for text in texts if len(text) > args.max_length])
+
+    print(f'{len(texts)} texts, {n_chars / 1e6:.1f} MB, rendered {args.repeat} times')
+    print(f'reference:   {reference_seconds:.3f} s, {args.repeat * n_chars / 1e6 / reference_seconds:.0f} MB/s')
+    print(f'ansi_to_html: {seconds:.3f} s, {args.repeat * n_chars / 1e6 / seconds:.0f} MB/s (identical html)')
+    print(f'{n_folded} texts longer than {args.max_length} characters: '
+          f'truncated {truncated_seconds:.3f} s, folded {folded_seconds:.3f} s')
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+time tagging error messages with utils.error_categories, comparing the compiled
+utils.ErrorClassifier against searching each engine's regexes one by one
+
+the messages are every error message (log.yml exceptions and detailed error logs)
+found in the results json files under --root, repeated to give --messages messages
+
+examples:
+    python -m utils.benchmark_error_classifier
+    python -m utils.benchmark_error_classifier --messages 100000
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import utils
+
+
+def parse_arguments():
+    "Parse command line arguments"
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark categorising engine error messages"
+    )
+
+    parser.add_argument(
+        "--root",
+        action="store",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), ".."),
+        help="Folder searched for results_*.json files",
+    )
+
+    parser.add_argument(
+        "--messages",
+        action="store",
+        type=int,
+        default=20000,
+        help="Number of (engine, message) pairs to categorise",
+    )
+
+    return parser.parse_args()
+
+
+def collect_messages(root):
+    'return (engine, error message) pairs from all the results json files under root'
+
+    messages = []
+    for path in glob.glob(os.path.join(root, '**', 'results_*.json'), recursive=True):
+        results = utils.load_results(path)
+        for engine, result in results.items():
+            if not isinstance(result, dict):
+                continue
+            exception = (result.get('log_yml') or {}).get('exception') or {}
+            if exception.get('message'):
+                messages.append((engine, exception['message']))
+            if (result.get('detailed_error_log') or {}).get('error_message'):
+                messages.append((engine, result['detailed_error_log']['error_message']))
+    return messages
+
+
+def classify_loop(engine, message):
+    'the one regex at a time search the classifier replaces'
+
+    for tag, regex in utils.error_categories.get(engine, {}).items():
+        if re.search(regex, message):
+            return tag
+    return "other"
+
+
+def benchmark(func, messages):
+    'tag all the messages, returns the tags and the seconds taken'
+
+    start_time = time.perf_counter()
+    tags = [func(engine, message) for engine, message in messages]
+    return tags, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    found = collect_messages(args.root)
+    if not found:
+        raise SystemExit(f'No error messages found in the results files under {args.root}')
+    messages = (found * (args.messages // len(found) + 1))[:args.messages]
+
+    classifier = utils.ErrorClassifier()
+    loop_tags, loop_seconds = benchmark(classify_loop, messages)
+    tags, seconds = benchmark(classifier.classify, messages)
+
+    assert tags == loop_tags, 'the compiled classifier disagrees with the one by one search'
+
+    categorised = len([t for t in tags if t != 'other'])
+    print(f'{len(messages)} messages ({len(found)} distinct in the results files), '
+          f'{100 * categorised / len(messages):.0f}% categorised')
+    print(f'one regex at a time: {loop_seconds:.3f} s, {len(messages) / loop_seconds:.0f} messages/s')
+    print(f'compiled classifier: {seconds:.3f} s, {len(messages) / seconds:.0f} messages/s')
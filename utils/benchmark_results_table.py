@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+time utils.create_results_table over many (model, engine) rows
+
+each model reuses the engine results in SBML/tests/results_local.json and a d1 plot folder
+padded with extra pdf files, as in a folder shared by many models
+
+examples:
+    python -m utils.benchmark_results_table
+    python -m utils.benchmark_results_table --models 500 --extra-plots 2000
+"""
+
+import argparse
+import copy
+import os
+import shutil
+import tempfile
+import time
+
+import utils
+
+
+def parse_arguments():
+    "Parse command line arguments"
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark building the per-model results tables"
+    )
+
+    parser.add_argument(
+        "--models",
+        action="store",
+        type=int,
+        default=100,
+        help="Number of models to build a results table for",
+    )
+
+    parser.add_argument(
+        "--extra-plots",
+        action="store",
+        type=int,
+        default=500,
+        help="Number of unrelated pdf files added to the d1 plot folder",
+    )
+
+    parser.add_argument(
+        "--results",
+        action="store",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "..", "SBML", "tests", "results_local.json"),
+        help="Results JSON file used for every model",
+    )
+
+    return parser.parse_args()
+
+
+def benchmark(results, n_models, n_extra_plots):
+    '''
+    build n_models results tables, returns the number of rows and the seconds taken
+    '''
+
+    starting_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        plot_dir = os.path.join('tests', 'd1_plots')
+        os.makedirs(plot_dir)
+        for e in results.keys():
+            open(os.path.join(plot_dir, f'{e}_plot.pdf'), 'w').close()
+        for i in range(n_extra_plots):
+            open(os.path.join(plot_dir, f'other_{i}.pdf'), 'w').close()
+
+        n_rows = 0
+        start_time = time.perf_counter()
+        try:
+            for i in range(n_models):
+                table = utils.create_results_table(copy.deepcopy(results), 'model.sbml', 'model.sedml', plot_dir)
+                n_rows += len(table)
+        finally:
+            os.chdir(starting_dir)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return n_rows, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    results = utils.load_results(args.results)
+
+    n_rows, seconds = benchmark(results, args.models, args.extra_plots)
+    print(f'{args.models} models, {n_rows} (model, engine) rows, {args.extra_plots} extra plots: '
+          f'{seconds:.2f} s, {n_rows / seconds:.0f} rows/s, {1000 * seconds / args.models:.1f} ms per model')
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+
+"""
+aggregate the per-model results_local.json and results_remote.json files into one
+model x engine matrix of outcomes and error types, and render a summary page with
+each engine's pass rates across all the models
+
+the matrix is kept in a columnar json store (one list per column, one row per model, engine and run)
+together with the modification time and size of each model's results files, so later updates
+only reparse the models whose results changed
+
+model folders searched, relative to --root:
+    BioModels/*/tests
+    test_suite/test_*/tests
+
+examples:
+    python -m utils.dashboard
+    python -m utils.dashboard --max-workers 8 --output compatibility_dashboard.md
+    python -m utils.dashboard --full
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import glob
+import json
+import os
+
+import utils
+
+RESULTS_FILES = {'local': 'results_local.json', 'remote': 'results_remote.json'}
+MODEL_GLOBS = [os.path.join('BioModels', '*', 'tests'), os.path.join('test_suite', 'test_*', 'tests')]
+COLUMNS = ['model', 'collection', 'engine', 'run', 'status', 'error_type']
+
+
+def parse_arguments():
+    "Parse command line arguments"
+
+    parser = argparse.ArgumentParser(
+        description="Aggregate all the models' biosimulators results into a compatibility dashboard"
+    )
+
+    parser.add_argument(
+        "--root",
+        action="store",
+        type=str,
+        default=".",
+        help="Repository root containing the BioModels and test_suite folders",
+    )
+
+    parser.add_argument(
+        "--store",
+        action="store",
+        type=str,
+        default="dashboard_store.json",
+        help="Columnar JSON store of the model x engine matrix, relative to --root",
+    )
+
+    parser.add_argument(
+        "--output",
+        action="store",
+        type=str,
+        default="compatibility_dashboard.md",
+        help="Markdown summary page, relative to --root",
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        action="store",
+        type=int,
+        default=None,
+        help="Number of processes parsing results files, defaults to the number of CPUs",
+    )
+
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the store and reparse every model",
+    )
+
+    return parser.parse_args()
+
+
+def find_model_dirs(root):
+    'return the tests folders of all the models, relative to root'
+
+    model_dirs = []
+    for pattern in MODEL_GLOBS:
+        model_dirs += [os.path.relpath(p, root) for p in glob.glob(os.path.join(root, pattern))]
+    return sorted([d for d in model_dirs if os.path.isdir(os.path.join(root, d))])
+
+
+def get_signature(root, model_dir):
+    'modification time and size of each results file, None for missing files'
+
+    signature = {}
+    for run, file_name in RESULTS_FILES.items():
+        try:
+            stat = os.stat(os.path.join(root, model_dir, file_name))
+            signature[run] = [stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            signature[run] = None
+    return signature
+
+
+def engine_outcome(engine, result):
+    '''
+    return (status, error type) of one engine's result
+    following the same rules as utils.create_results_table
+    status is "pass", "FAIL", "WARNING", "XFAIL" or "unknown"
+    the error type is the error category (see utils.error_categories), or the exception type if uncategorised
+    '''
+
+    if engine in utils.ENGINES and 'sbml' not in utils.ENGINES[engine]['formats'][0]:
+        return 'XFAIL', ''
+
+    # a failed download is recorded as ["FAIL", message, type]
+    if not isinstance(result, dict):
+        return 'FAIL', str(result[2]) if len(result) > 2 else ''
+
+    outcome = utils.process_log_yml_dict(result.get('log_yml') or {}, engine)
+    if result.get('detailed_error_log'):
+        outcome['status'] = result['detailed_error_log']['status']
+    if result.get('container', {}).get('status') in ['TIMEOUT', 'OOMKilled']:
+        outcome['status'] = 'FAIL'
+        outcome['error_category'] = result['container']['status']
+
+    error_type = outcome['error_category'] if outcome['error_category'] not in ['', 'other'] else outcome['exception_type']
+    return outcome['status'] or 'unknown', error_type or ''
+
+
+def parse_model(root, model_dir):
+    'return the columns of one model, one row per engine and run'
+
+    columns = {key: [] for key in COLUMNS}
+    model = os.path.dirname(model_dir)
+    collection = model.split(os.sep)[0]
+
+    for run, file_name in RESULTS_FILES.items():
+        path = os.path.join(root, model_dir, file_name)
+        if not os.path.isfile(path):
+            continue
+        results = utils.load_results(path)
+
+        for engine, result in results.items():
+            status, error_type = engine_outcome(engine, result)
+            for key, value in zip(COLUMNS, [model, collection, engine, run, status, error_type]):
+                columns[key].append(value)
+
+    return model_dir, columns
+
+
+def load_store(path):
+    'load the columnar store, or return an empty one'
+
+    if os.path.isfile(path):
+        with open(path) as f:
+            return json.load(f)
+    return {'signatures': {}, 'columns': {key: [] for key in COLUMNS}}
+
+
+def update_store(root, store, max_workers=None):
+    '''
+    bring the store up to date with the results files under root
+    only models whose results files were added, changed or removed are reparsed
+    returns the number of models reparsed and removed
+    '''
+
+    model_dirs = find_model_dirs(root)
+    signatures = {model_dir: get_signature(root, model_dir) for model_dir in model_dirs}
+
+    changed = [d for d in model_dirs if store['signatures'].get(d) != signatures[d]]
+    removed = [d for d in store['signatures'] if d not in signatures]
+    stale = set([os.path.dirname(d) for d in changed + removed])
+
+    # drop the rows of changed and removed models
+    columns = store['columns']
+    keep = [i for i, model in enumerate(columns['model']) if model not in stale]
+    columns = {key: [columns[key][i] for i in keep] for key in COLUMNS}
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for model_dir, model_columns in executor.map(parse_model, [root] * len(changed), changed, chunksize=16):
+            for key in COLUMNS:
+                columns[key] += model_columns[key]
+
+    store['columns'] = columns
+    store['signatures'] = signatures
+
+    return len(changed), len(removed)
+
+
+def summarise(columns):
+    '''
+    per engine and run counts of each status and of the error types of failures
+    returns {engine: {run: {"status": Counter, "errors": Counter}}}
+    '''
+
+    summary = collections.defaultdict(lambda: collections.defaultdict(lambda: {'status': collections.Counter(),
+                                                                               'errors': collections.Counter()}))
+    for engine, run, status, error_type in zip(columns['engine'], columns['run'], columns['status'], columns['error_type']):
+        counts = summary[engine][run]
+        counts['status'][status] += 1
+        if status == 'FAIL':
+            counts['errors'][error_type or 'unknown'] += 1
+
+    return summary
+
+
+def pass_rate(counts):
+    'pass rate cell, expected failures are left out of the rate'
+
+    tested = sum(counts.values()) - counts['XFAIL']
+    if tested == 0:
+        return 'NA' if counts['XFAIL'] == 0 else 'XFAIL'
+    return f"{100 * counts['pass'] / tested:.0f}% ({counts['pass']}/{tested})"
+
+
+def write_dashboard(columns, output_file):
+    'write the per-engine summary page'
+
+    summary = summarise(columns)
+    n_models = len(set(columns['model']))
+
+    table = utils.MarkdownTable("Engine|Models|Remote pass rate|Local pass rate|Most common errors",
+                                "engine|n_models|remote|local|errors")
+
+    for engine in sorted(summary.keys(), key=lambda e: list(utils.ENGINES.keys()).index(e) if e in utils.ENGINES else len(utils.ENGINES)):
+        runs = summary[engine]
+        name = utils.ENGINES[engine]['name'] if engine in utils.ENGINES else engine
+        errors = runs['remote']['errors'] + runs['local']['errors']
+        table.new_row({"engine": name,
+                       "n_models": max([sum(runs[run]['status'].values()) for run in runs]),
+                       "remote": pass_rate(runs['remote']['status']),
+                       "local": pass_rate(runs['local']['status']),
+                       "errors": ', '.join([f'{error} ({count})' for error, count in errors.most_common(3)])})
+
+    table.add_summary("engine", f"n={table.n_rows()}")
+    table.add_summary("n_models", f"n={n_models}")
+
+    with open(output_file, 'w', encoding='utf-8') as fout:
+        fout.write('# Engine compatibility across all models\n\n')
+        fout.write(f'Aggregated from the results of {n_models} models. '
+                   'Pass rates leave out expected failures (engines that do not support SBML).\n\n')
+        table.write(fout)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    store_path = os.path.join(args.root, args.store)
+    store = load_store(store_path) if not args.full else load_store('')
+
+    n_changed, n_removed = update_store(args.root, store, max_workers=args.max_workers)
+    print(f'Reparsed {n_changed} models, removed {n_removed}, {len(store["signatures"])} models in the store')
+
+    with open(store_path, 'w') as f:
+        json.dump(store, f)
+
+    output_file = os.path.join(args.root, args.output)
+    write_dashboard(store['columns'], output_file)
+    print(f'Written {output_file}')
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+
+"""
+a local stand-in for the biosimulations and biosimulators apis, so the remote code path
+(submission, status polling, log and results downloads) can run offline and be load tested
+
+archives submitted to POST /runs are run with the local executors (see utils.EXECUTORS)
+and their outputs served back as the results archive, so results match local runs
+
+endpoints (the subset used by pyneuroml.biosimulations and utils):
+    GET  /health
+    POST /runs                    multipart "file" (omex) and "simulationRun" (json)
+    GET  /runs/{id}               run status: QUEUED, RUNNING, SUCCEEDED or FAILED
+    GET  /logs/{id}               the run's log.yml as json, 404 until the run has finished
+    GET  /results/{id}/download   results zip (HEAD and Range supported), 404 until finished
+    GET  /simulators              every engine in utils.ENGINES with the version "local"
+    GET  /simulators/{id}
+
+examples:
+    python -m utils.fake_biosimulations --port 8000 --queue-delay 5 --failure-rate 0.05
+    python -m utils.fake_biosimulations --backend in-process --latency 0.2 --max-workers 4
+
+then point utils at it with utils.set_biosimulations_api_url("http://localhost:8000")
+or use it from python:
+    with FakeBioSimulations(queue_delay=1) as server:
+        utils.set_biosimulations_api_url(server.url)
+"""
+
+import argparse
+import email.parser
+import email.policy
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import utils
+
+
+class FakeBioSimulations:
+    '''
+    fake biosimulations server running in a background thread
+
+    latency: seconds added to every response
+    queue_delay: seconds a run stays QUEUED before it is executed
+    failure_rate: fraction of requests (other than /health) answered with 503
+    backend: EXECUTORS key used to run the archives, defaults to each engine's backend
+    max_workers: number of runs executed at the same time (in-process runs still execute one at a time)
+    '''
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, queue_delay=0.0, failure_rate=0.0,
+                 backend=None, max_workers=2):
+        self.latency = latency
+        self.queue_delay = queue_delay
+        self.failure_rate = failure_rate
+        self.backend = backend
+
+        self.runs = {}
+        self.lock = threading.Lock()
+        self.run_dir = tempfile.mkdtemp(prefix='fake_biosimulations_')
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+        self.httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        'serve requests in a background thread'
+
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        'stop serving, wait for running jobs and remove their files'
+
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.shutdown(wait=True)
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self, archive, simulation_run):
+        'record a new run and queue it for execution, returns the run dict'
+
+        run_id = uuid.uuid4().hex[:24]
+        run = {"id": run_id,
+               "name": simulation_run.get("name", ""),
+               "simulator": simulation_run["simulator"],
+               "simulatorVersion": simulation_run.get("simulatorVersion", ""),
+               "status": "QUEUED",
+               "submitted": time.time(),
+               "results": None,
+               "log": None}
+
+        os.makedirs(os.path.join(self.run_dir, run_id))
+        with open(os.path.join(self.run_dir, run_id, 'archive.omex'), 'wb') as f:
+            f.write(archive)
+
+        with self.lock:
+            self.runs[run_id] = run
+        self.pool.submit(self.execute, run_id)
+
+        return run
+
+    def execute(self, run_id):
+        'run a queued archive with the local executor and store its results zip and log'
+
+        run = self.runs[run_id]
+        time.sleep(max(0, run["submitted"] + self.queue_delay - time.time()))
+        run["status"] = "RUNNING"
+
+        job_dir = os.path.join(self.run_dir, run_id)
+        output_dir = os.path.join(job_dir, 'output')
+        try:
+            utils.biosimulators_core(run["simulator"], os.path.join(job_dir, 'archive.omex'),
+                                     output_dir=output_dir, backend=self.backend)
+        except Exception as e:
+            print(f'Run {run_id} ({run["simulator"]}) raised {type(e).__name__}: {e}')
+
+        log = {}
+        if os.path.exists(os.path.join(output_dir, 'log.yml')):
+            with open(os.path.join(output_dir, 'log.yml')) as f:
+                log = utils.load_yaml(f) or {}
+
+        results = io.BytesIO()
+        with zipfile.ZipFile(results, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for root, _, files in os.walk(output_dir):
+                for file in files:
+                    path = os.path.join(root, file)
+                    zf.write(path, os.path.relpath(path, output_dir))
+
+        shutil.rmtree(job_dir, ignore_errors=True)
+        run["results"] = results.getvalue()
+        run["log"] = log
+        run["status"] = "SUCCEEDED" if log.get("status") == "SUCCEEDED" else "FAILED"
+
+    def make_handler(self):
+        'return a request handler class bound to this server'
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, code, content):
+                body = json.dumps(content).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            def send_zip(self, data):
+                'send a results zip, honouring a "Range: bytes=start-" header'
+
+                start = 0
+                range_header = self.headers.get('Range', '')
+                if range_header.startswith('bytes=') and range_header[6:].split('-')[0].isdigit():
+                    start = min(int(range_header[6:].split('-')[0]), len(data))
+
+                self.send_response(206 if start else 200)
+                self.send_header('Content-Type', 'application/zip')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(len(data) - start))
+                if start:
+                    self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(data[start:])
+
+            def inject(self, path):
+                'apply the latency and failure rate, returns True if the request was failed'
+
+                time.sleep(server.latency)
+                if path != '/health' and random.random() < server.failure_rate:
+                    self.send_json(503, {"error": "injected failure"})
+                    return True
+                return False
+
+            def get_run(self, run_id):
+                with server.lock:
+                    run = server.runs.get(run_id)
+                if run is None:
+                    self.send_json(404, {"error": f"run {run_id} not found"})
+                return run
+
+            def do_GET(self):
+                parts = urlparse(self.path).path.strip('/').split('/')
+                path = '/' + '/'.join(parts)
+                if self.inject(path):
+                    return
+
+                if path == '/health':
+                    self.send_json(200, {"status": "ok"})
+                elif parts[0] == 'simulators':
+                    engines = parts[1:2] if len(parts) > 1 else list(utils.ENGINES.keys())
+                    self.send_json(200, [{"id": e, "version": "local"} for e in engines])
+                elif parts[0] == 'runs' and len(parts) == 2:
+                    run = self.get_run(parts[1])
+                    if run:
+                        self.send_json(200, {k: v for k, v in run.items() if k not in ['results', 'log']})
+                elif parts[0] == 'logs' and len(parts) == 2:
+                    run = self.get_run(parts[1])
+                    if run and run["log"] is None:
+                        self.send_json(404, {"error": "log not available yet"})
+                    elif run:
+                        self.send_json(200, run["log"])
+                elif parts[0] == 'results' and len(parts) == 3 and parts[2] == 'download':
+                    run = self.get_run(parts[1])
+                    if run and run["results"] is None:
+                        self.send_json(404, {"error": "results not available yet"})
+                    elif run:
+                        self.send_zip(run["results"])
+                else:
+                    self.send_json(404, {"error": f"unknown endpoint {path}"})
+
+            do_HEAD = do_GET
+
+            def do_POST(self):
+                path = urlparse(self.path).path.rstrip('/')
+                if self.inject(path):
+                    return
+                if path != '/runs':
+                    self.send_json(404, {"error": f"unknown endpoint {path}"})
+                    return
+
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                header = f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode('utf-8')
+                message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + body)
+
+                fields = {}
+                for part in message.iter_parts():
+                    fields[part.get_param('name', header='content-disposition')] = part.get_payload(decode=True)
+
+                if 'file' not in fields or 'simulationRun' not in fields:
+                    self.send_json(400, {"error": "expected multipart fields 'file' and 'simulationRun'"})
+                    return
+
+                run = server.submit(fields['file'], json.loads(fields['simulationRun']))
+                self.send_json(201, {k: v for k, v in run.items() if k not in ['results', 'log']})
+
+        return Handler
+
+
+def parse_arguments():
+    "Parse command line arguments"
+
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the BioSimulations API that runs archives with the local executors"
+    )
+
+    parser.add_argument(
+        "--host",
+        action="store",
+        type=str,
+        default="127.0.0.1",
+        help="Address to listen on",
+    )
+
+    parser.add_argument(
+        "--port",
+        action="store",
+        type=int,
+        default=8000,
+        help="Port to listen on",
+    )
+
+    parser.add_argument(
+        "--latency",
+        action="store",
+        type=float,
+        default=0.0,
+        help="Seconds added to every response",
+    )
+
+    parser.add_argument(
+        "--queue-delay",
+        action="store",
+        type=float,
+        default=0.0,
+        help="Seconds each run stays QUEUED before it is executed",
+    )
+
+    parser.add_argument(
+        "--failure-rate",
+        action="store",
+        type=float,
+        default=0.0,
+        help="Fraction of API requests (other than /health) answered with 503",
+    )
+
+    parser.add_argument(
+        "--backend",
+        action="store",
+        default=None,
+        choices=list(utils.EXECUTORS.keys()),
+        help="Backend used to run the archives instead of each engine's backend in utils.ENGINES",
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        action="store",
+        type=int,
+        default=2,
+        help="Number of archives executed at the same time",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    server = FakeBioSimulations(host=args.host,
+                                port=args.port,
+                                latency=args.latency,
+                                queue_delay=args.queue_delay,
+                                failure_rate=args.failure_rate,
+                                backend=args.backend,
+                                max_workers=args.max_workers)
+
+    print(f'Serving a fake BioSimulations API at {server.url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
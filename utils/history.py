@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+"""
+append-only history of every engine run, kept in a sqlite database so outcomes can be
+compared across runs instead of through git diffs of the results json files
+
+each RunHistory object is one run (eg one invocation of a test script), every model, engine
+and backend ("local" or "remote") it records is one row of the outcomes table with the status,
+error category, runtime and engine build of that engine run: the simulator version for remote runs,
+the engine digest (docker image id or biosimulators package version, see utils.get_engine_digest) for local runs
+rows are only ever inserted, the latest table just points at each (model, engine, backend)'s newest row
+
+queries (each is a handful of index lookups, so stays fast however many runs are stored):
+    changes       outcomes of the latest run that differ from the previous run of the same model and engine,
+                  with the engine builds of both runs
+    regressions   engines whose pass rate over the latest run's models is lower than in their previous runs,
+                  with the number of those models whose engine build changed
+    slowest       the slowest engines of each model in its latest run
+
+examples:
+    python -m utils.history changes
+    python -m utils.history regressions --run 12
+    python -m utils.history slowest --model BioModels/BIOMD0000000001 --limit 5
+    python -m utils.history record --label baseline    # record the current results json files as a run
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import subprocess
+import time
+
+import docker
+
+import utils
+from utils.dashboard import MODEL_GLOBS, RESULTS_FILES, engine_outcome
+
+HISTORY_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'run_history.sqlite')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    label TEXT,
+    git_commit TEXT
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    outcome_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    model TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error_category TEXT,
+    wall_seconds REAL,
+    simulator_version TEXT,
+    image TEXT,  -- engine digest of local runs, see utils.get_engine_digest
+    reused INTEGER NOT NULL DEFAULT 0,
+    recorded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outcomes_by_key ON outcomes(model, engine, backend, run_id);
+CREATE INDEX IF NOT EXISTS outcomes_by_run ON outcomes(run_id);
+CREATE TABLE IF NOT EXISTS latest (
+    model TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    outcome_id INTEGER NOT NULL REFERENCES outcomes(outcome_id),
+    PRIMARY KEY (model, engine, backend)
+);
+'''
+
+
+def git_commit():
+    'commit hash of the repository, or None outside a git checkout'
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class RunHistory:
+    '''
+    one run in the sqlite run history
+
+    path: the sqlite database, created if missing
+    label: optional description of the run, eg the script that made it
+    the run is only added to the runs table when its first outcome is recorded
+    '''
+
+    def __init__(self, path=HISTORY_DB, label=None):
+        self.path = path
+        self.label = label
+        self.run_id = None
+        self.digests = {}
+
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def start_run(self):
+        'add this run to the runs table, returns its run_id'
+
+        if self.run_id is None:
+            with self.db:
+                cursor = self.db.execute('INSERT INTO runs (started, label, git_commit) VALUES (?, ?, ?)',
+                                         (time.time(), self.label, git_commit()))
+            self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def engine_digest(self, engine):
+        'current utils.get_engine_digest of the engine, for results written before engine digests were recorded'
+
+        if engine not in self.digests:
+            try:
+                self.digests[engine] = utils.get_engine_digest(engine)
+            except docker.errors.DockerException:
+                self.digests[engine] = None
+        return self.digests[engine]
+
+    def record(self, model, backend, results):
+        '''
+        record one model's engine results (the dicts written to results_local.json or results_remote.json)
+        backend: "local" or "remote"
+        '''
+
+        run_id = self.start_run()
+        now = time.time()
+        with self.db:
+            for engine, result in results.items():
+                status, error_category = engine_outcome(engine, result)
+
+                wall_seconds = None
+                simulator_version = image = None
+                reused = False
+                if isinstance(result, dict):
+                    log_yml = result.get('log_yml') or {}
+                    wall_seconds = (result.get('telemetry') or {}).get('wall_seconds') or log_yml.get('duration')
+                    simulator_version = result.get('simulator_version')
+                    reused = result.get('cache') == 'hit' or result.get('ledger') == 'reused'
+                if backend == 'local':
+                    image = result.get('engine_digest') if isinstance(result, dict) else None
+                    image = image or self.engine_digest(engine)
+
+                cursor = self.db.execute('INSERT INTO outcomes (run_id, model, engine, backend, status, error_category, '
+                                         'wall_seconds, simulator_version, image, reused, recorded) '
+                                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                         (run_id, model, engine, backend, status, error_category or None,
+                                          wall_seconds, simulator_version, image, int(reused), now))
+                self.db.execute('INSERT INTO latest (model, engine, backend, run_id, outcome_id) VALUES (?, ?, ?, ?, ?) '
+                                'ON CONFLICT (model, engine, backend) DO UPDATE SET run_id = excluded.run_id, outcome_id = excluded.outcome_id',
+                                (model, engine, backend, run_id, cursor.lastrowid))
+
+    def last_run(self):
+        'run_id of the latest run with recorded outcomes, or None'
+
+        row = self.db.execute('SELECT MAX(run_id) FROM outcomes').fetchone()
+        return row[0]
+
+    def changes(self, run_id=None):
+        '''
+        outcomes of the run (the latest by default) that differ from the previous outcome of the same model, engine and backend
+        models and engines without an earlier outcome are left out
+        build is the engine digest of local runs and the simulator version of remote runs
+        '''
+
+        run_id = run_id or self.last_run()
+        return self.db.execute('''
+            SELECT cur.model, cur.engine, cur.backend,
+                   prev.run_id AS previous_run, prev.status AS previous_status, prev.error_category AS previous_error,
+                   cur.status, cur.error_category AS error,
+                   IFNULL(prev.image, prev.simulator_version) AS previous_build, IFNULL(cur.image, cur.simulator_version) AS build
+            FROM outcomes cur
+            JOIN outcomes prev ON prev.outcome_id = (
+                SELECT outcome_id FROM outcomes
+                WHERE model = cur.model AND engine = cur.engine AND backend = cur.backend AND run_id < cur.run_id
+                ORDER BY run_id DESC LIMIT 1)
+            WHERE cur.run_id = ?
+              AND (prev.status != cur.status OR IFNULL(prev.error_category, '') != IFNULL(cur.error_category, ''))
+            ORDER BY cur.model, cur.engine, cur.backend''', (run_id,)).fetchall()
+
+    def regressions(self, run_id=None):
+        '''
+        engines (per backend) whose pass rate over the run's models (the latest run by default)
+        is lower than over the same models' previous outcomes, expected failures are left out
+        '''
+
+        run_id = run_id or self.last_run()
+        return self.db.execute('''
+            SELECT cur.engine, cur.backend, COUNT(*) AS n_models,
+                   SUM(prev.status = 'pass') AS previous_passes, SUM(cur.status = 'pass') AS passes,
+                   SUM(IFNULL(prev.image, prev.simulator_version) IS NOT IFNULL(cur.image, cur.simulator_version)) AS build_changes
+            FROM outcomes cur
+            JOIN outcomes prev ON prev.outcome_id = (
+                SELECT outcome_id FROM outcomes
+                WHERE model = cur.model AND engine = cur.engine AND backend = cur.backend AND run_id < cur.run_id
+                ORDER BY run_id DESC LIMIT 1)
+            WHERE cur.run_id = ? AND cur.status != 'XFAIL' AND prev.status != 'XFAIL'
+            GROUP BY cur.engine, cur.backend
+            HAVING passes < previous_passes
+            ORDER BY previous_passes - passes DESC, cur.engine''', (run_id,)).fetchall()
+
+    def slowest(self, model=None, limit=3):
+        '''
+        the limit slowest engines of each model (or of the one model given) in their latest outcomes
+        '''
+
+        return self.db.execute('''
+            SELECT model, engine, backend, wall_seconds, status, run_id FROM (
+                SELECT o.model, o.engine, o.backend, o.wall_seconds, o.status, o.run_id,
+                       ROW_NUMBER() OVER (PARTITION BY o.model ORDER BY o.wall_seconds DESC) AS rank
+                FROM latest l JOIN outcomes o ON o.outcome_id = l.outcome_id
+                WHERE o.wall_seconds IS NOT NULL AND (? IS NULL OR l.model = ?))
+            WHERE rank <= ?
+            ORDER BY model, wall_seconds DESC''', (model, model, limit)).fetchall()
+
+
+def record_results_files(history, root):
+    'record the results json files of every model folder under root as one run, returns the number of models'
+
+    n_models = 0
+    for pattern in MODEL_GLOBS + ['SBML/tests']:
+        for model_dir in sorted(glob.glob(os.path.join(root, pattern))):
+            recorded = False
+            for backend, file_name in RESULTS_FILES.items():
+                path = os.path.join(model_dir, file_name)
+                if os.path.isfile(path):
+                    history.record(os.path.relpath(os.path.dirname(model_dir), root), backend, utils.load_results(path))
+                    recorded = True
+            n_models += recorded
+    return n_models
+
+
+def print_rows(rows):
+    'print query results as aligned columns'
+
+    if not rows:
+        print('(none)')
+        return
+    columns = rows[0].keys()
+    cells = [[('' if row[c] is None else f'{row[c]:.1f}' if isinstance(row[c], float) else str(row[c])) for c in columns] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    print('  '.join([c.ljust(w) for c, w in zip(columns, widths)]))
+    for r in cells:
+        print('  '.join([v.ljust(w) for v, w in zip(r, widths)]))
+
+
+def parse_arguments():
+    "Parse command line arguments"
+
+    parser = argparse.ArgumentParser(
+        description="Query the history of engine outcomes across runs"
+    )
+
+    parser.add_argument(
+        "query",
+        action="store",
+        choices=["changes", "regressions", "slowest", "record"],
+        help="Query to print, or record to add the current results json files as a new run",
+    )
+
+    parser.add_argument(
+        "--db",
+        action="store",
+        type=str,
+        default=HISTORY_DB,
+        help="SQLite run history database",
+    )
+
+    parser.add_argument(
+        "--run",
+        action="store",
+        type=int,
+        default=None,
+        help="Run compared with the previous runs by changes and regressions, defaults to the latest run",
+    )
+
+    parser.add_argument(
+        "--model",
+        action="store",
+        type=str,
+        default=None,
+        help="Limit slowest to one model, eg BioModels/BIOMD0000000001",
+    )
+
+    parser.add_argument(
+        "--limit",
+        action="store",
+        type=int,
+        default=3,
+        help="Number of engines listed per model by slowest",
+    )
+
+    parser.add_argument(
+        "--root",
+        action="store",
+        type=str,
+        default=".",
+        help="Repository root searched for results json files by record",
+    )
+
+    parser.add_argument(
+        "--label",
+        action="store",
+        type=str,
+        default="record",
+        help="Label of the run added by record",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    history = RunHistory(args.db, label=args.label)
+
+    start_time = time.perf_counter()
+    if args.query == "record":
+        n_models = record_results_files(history, args.root)
+        print(f'Recorded {n_models} models as run {history.run_id}')
+    elif args.query == "changes":
+        print_rows(history.changes(args.run))
+    elif args.query == "regressions":
+        print_rows(history.regressions(args.run))
+    elif args.query == "slowest":
+        print_rows(history.slowest(args.model, args.limit))
+    print(f'({1000 * (time.perf_counter() - start_time):.1f} ms)')
+
+    history.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+"""
+pull the biosimulators docker images in parallel, record their digests and sizes
+and run a small warm up archive with each engine, so later local runs measure
+simulation time rather than registry downloads
+
+examples:
+    python -m utils.prepare_engines
+    python -m utils.prepare_engines --engines tellurium copasi --max-workers 2 --pin
+    python -m utils.prepare_engines --no-warm-up --images-file engine_images.json
+
+use the recorded digests in later runs with utils.pin_engine_images("engine_images.json")
+or --pinned-images in SBML/tests/test_biosimulators_local.py
+"""
+
+import argparse
+
+import utils
+
+
+def parse_arguments():
+    "Parse command line arguments"
+
+    parser = argparse.ArgumentParser(
+        description="Pull and warm up the biosimulators docker images of the engines"
+    )
+
+    parser.add_argument(
+        "--engines",
+        action="extend",
+        nargs="+",
+        type=str,
+        default=[],
+        help="Engines to prepare (keys of utils.ENGINES). Empty list means all engines",
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        action="store",
+        type=int,
+        default=4,
+        help="Maximum number of images pulled (and engines warmed up) at the same time",
+    )
+
+    parser.add_argument(
+        "--images-file",
+        action="store",
+        type=str,
+        default="engine_images.json",
+        help="JSON file the image digests, sizes and warm up results are written to",
+    )
+
+    parser.add_argument(
+        "--pin",
+        action="store_true",
+        help="Run the warm up with the images pinned to the digests just pulled",
+    )
+
+    parser.add_argument(
+        "--no-warm-up",
+        action="store_true",
+        help="Only pull the images, skip the warm up archive",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    engine_keys = args.engines if args.engines != [] else list(utils.ENGINES.keys())
+
+    utils.prepare_engines(engine_keys,
+                          max_workers=args.max_workers,
+                          images_file=args.images_file,
+                          pin=args.pin,
+                          warm_up=not args.no_warm_up)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+
+"""
+numeric agreement between engines, from the SED-ML reports (reports.h5, or csv files) their runs write
+
+the reports of every engine run of a model are collected into one compressed columnar numpy store
+(reports.npz next to the results json files): each report of each run is a 2D array with one row
+per data set (eg time and the species) and one column per time point, plus a json index of the
+backend, engine, report and data set labels of every array
+
+each report's data sets are interpolated onto a common time grid and compared with the consensus
+(the median of all the engine runs) or with a reference engine's runs
+a data set agrees if it stays within AGREEMENT_RTOL of the consensus's range at every grid point,
+grid points outside a run's time course count as disagreements, so runs that stop early
+(eg amici reaching its maximum number of steps half way, see utils.process_log_yml_dict) are caught
+
+examples:
+    python -m utils.reports SBML/tests/reports.npz
+    python -m utils.reports SBML/tests/reports.npz --reference copasi
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import warnings
+
+import h5py
+import numpy as np
+
+REPORTS_FILE = 'reports.npz'
+
+# a data set agrees if its largest difference from the consensus is within this fraction of
+# the consensus data set's range (or of its largest absolute value, for constant data sets)
+AGREEMENT_RTOL = 1e-2
+AGREEMENT_ATOL = 1e-12
+
+# labels (lower case) of the time data set, the first data set is used if none match
+TIME_LABELS = ['time', 't']
+
+
+def read_h5_reports(path):
+    'the reports in a biosimulators reports.h5 file as {report: (labels, data)}'
+
+    reports = {}
+
+    def visit(name, obj):
+        if not isinstance(obj, h5py.Dataset):
+            return
+        try:
+            data = np.asarray(obj[()], dtype=float)
+        except (TypeError, ValueError):
+            return
+        data = data.reshape(len(data), -1) if data.ndim else data.reshape(1, 1)
+        labels = obj.attrs.get('sedDataSetLabels', obj.attrs.get('sedDataSetIds'))
+        if labels is None or len(labels) != len(data):
+            labels = [str(i) for i in range(len(data))]
+        reports[name] = ([l.decode('utf-8') if isinstance(l, bytes) else str(l) for l in labels], data)
+
+    with h5py.File(path, 'r') as f:
+        f.visititems(visit)
+    return reports
+
+
+def read_csv_report(path):
+    'a biosimulators csv report (one row per data set, the label then its values) as (labels, data)'
+
+    with open(path, newline='') as f:
+        rows = [row for row in csv.reader(f) if row]
+    n_points = max([len(row) - 1 for row in rows], default=0)
+    data = np.full((len(rows), n_points), np.nan)
+    for i, row in enumerate(rows):
+        data[i, :len(row) - 1] = [float(v) if v.strip() else np.nan for v in row[1:]]
+    return [row[0] for row in rows], data
+
+
+def read_reports(output_dir):
+    '''
+    the reports an engine run wrote to output_dir, as {report: (labels, data)}
+    reports.h5 files are used if there are any, otherwise the csv reports (keyed by their path without .csv)
+    '''
+
+    reports = {}
+    for path in sorted(glob.glob(os.path.join(output_dir, '**', '*.h5'), recursive=True)):
+        try:
+            reports.update(read_h5_reports(path))
+        except OSError as e:
+            print(f'Could not read the reports in {path}: {e}')
+    if reports:
+        return reports
+
+    for path in sorted(glob.glob(os.path.join(output_dir, '**', '*.csv'), recursive=True)):
+        try:
+            reports[os.path.relpath(path, output_dir)[:-len('.csv')].replace(os.sep, '/')] = read_csv_report(path)
+        except (OSError, ValueError) as e:
+            print(f'Could not read the report {path}: {e}')
+    return reports
+
+
+def split_time(labels, data):
+    'split a report into (time, data set labels, values), dropping time points that are not finite'
+
+    lower = [l.lower() for l in labels]
+    i_time = next((i for i, l in enumerate(lower) if l in TIME_LABELS), 0)
+    time = data[i_time]
+    keep = np.isfinite(time)
+    rows = [i for i in range(len(labels)) if i != i_time]
+    return time[keep], [labels[i] for i in rows], data[rows][:, keep]
+
+
+def interpolate(time, values, grid):
+    '''
+    linearly interpolate every row of values (data sets x time points) onto grid at once
+    grid points outside the time course are NaN
+    '''
+
+    values = np.atleast_2d(values)
+    if np.array_equal(time, grid):
+        return values
+    if len(time) == 0:
+        return np.full((len(values), len(grid)), np.nan)
+    if len(time) == 1:
+        return np.where(np.isclose(grid, time[0]), values[:, :1], np.nan)
+
+    order = np.argsort(time, kind='stable')
+    time, values = time[order], values[:, order]
+    i = np.clip(np.searchsorted(time, grid, side='right') - 1, 0, len(time) - 2)
+    t0, t1 = time[i], time[i + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = np.where(t1 > t0, (grid - t0) / (t1 - t0), 0.0)
+    result = values[:, i] * (1 - w) + values[:, i + 1] * w
+
+    margin = 1e-9 * (time[-1] - time[0])
+    result[:, (grid < time[0] - margin) | (grid > time[-1] + margin)] = np.nan
+    return result
+
+
+def common_grid(times, reference_times=None):
+    '''
+    time grid a report's runs are compared on: the reference run's time points if given,
+    otherwise the median start, end and number of time points of the runs,
+    so one run stopping early does not shorten the grid
+    '''
+
+    if reference_times is not None:
+        return np.sort(reference_times)
+    times = [t for t in times if len(t)]
+    if not times:
+        return np.array([])
+    start = np.median([t.min() for t in times])
+    end = np.median([t.max() for t in times])
+    n_points = int(np.median([len(t) for t in times]))
+    return np.linspace(start, end, max(n_points, 1))
+
+
+def score_agreement(reports, reference=None, rtol=AGREEMENT_RTOL, atol=AGREEMENT_ATOL):
+    '''
+    compare every run's reports with the consensus (or the reference engine's runs)
+    reports: {(backend, engine): {report: (labels, data)}}
+    returns {(backend, engine): {"agree": data sets agreeing, "n": data sets compared, "max_error": largest relative error}}
+    a max_error of inf means the run is missing part of the time course
+    '''
+
+    scores = {run: {'agree': 0, 'n': 0, 'max_error': 0.0} for run in reports}
+    report_names = sorted(set([name for run_reports in reports.values() for name in run_reports]))
+
+    for name in report_names:
+        runs = [run for run in reports if name in reports[run]]
+        if len(runs) < 2:
+            continue
+        split = [split_time(*reports[run][name]) for run in runs]
+        reference_runs = [i for i, run in enumerate(runs) if run[1] == reference]
+        if reference and not reference_runs:
+            continue
+
+        grid = common_grid([s[0] for s in split], split[reference_runs[0]][0] if reference_runs else None)
+        if len(grid) == 0:
+            continue
+
+        # runs x data sets x grid points, NaN for data sets a run does not have
+        labels = sorted(set([l for s in split for l in s[1]]))
+        label_index = {l: i for i, l in enumerate(labels)}
+        cube = np.full((len(runs), len(labels), len(grid)), np.nan)
+        present = np.zeros((len(runs), len(labels)), dtype=bool)
+        for r, (time, run_labels, values) in enumerate(split):
+            rows = [label_index[l] for l in run_labels]
+            cube[r, rows] = interpolate(time, values, grid)
+            present[r, rows] = True
+
+        # np.median partitions in place of nanmedian's masked sort, when no run is missing values
+        compared = cube[reference_runs] if reference_runs else cube
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            consensus = np.nanmedian(compared, axis=0) if np.isnan(compared).any() else np.median(compared, axis=0)
+            scale = np.maximum(np.nanmax(consensus, axis=1) - np.nanmin(consensus, axis=1), np.nanmax(np.abs(consensus), axis=1))
+        scale = np.maximum(np.nan_to_num(scale), atol)
+
+        # grid points without a consensus are skipped, points a run is missing count as infinite errors
+        has_consensus = np.isfinite(consensus)
+        error = np.abs(cube - consensus) / scale[:, None]
+        error[np.isnan(error) & has_consensus] = np.inf
+        error[:, ~has_consensus] = 0
+        max_error = error.max(axis=2)
+        present &= has_consensus.any(axis=1)
+
+        for r, run in enumerate(runs):
+            if not present[r].any():
+                continue
+            scores[run]['agree'] += int((max_error[r, present[r]] <= rtol).sum())
+            scores[run]['n'] += int(present[r].sum())
+            scores[run]['max_error'] = max(scores[run]['max_error'], float(max_error[r, present[r]].max()))
+
+    return {run: score for run, score in scores.items() if score['n']}
+
+
+def agreement_cell(score):
+    'results table cell of one run\'s score, eg "12/12" or "3/12 (max error 48%)"'
+
+    cell = f"{score['agree']}/{score['n']}"
+    if score['agree'] < score['n']:
+        error = 'incomplete time course' if np.isinf(score['max_error']) else f"max error {score['max_error']:.0%}"
+        cell += f' ({error})'
+    return cell
+
+
+class ReportStore:
+    '''
+    the reports of every engine run of one model
+
+    reference: engine the runs are compared with, or None to compare with the consensus of all the runs
+    '''
+
+    def __init__(self, reference=None):
+        self.reference = reference
+        self.reports = {}
+
+    def add(self, backend, engine, output_dir):
+        'collect the reports an engine run wrote to output_dir, backend is "local" or "remote"'
+
+        reports = read_reports(output_dir)
+        if reports:
+            self.reports[(backend, engine)] = reports
+        return len(reports)
+
+    def save(self, path):
+        'write the store as a compressed npz file, one array per report and run plus a json index'
+
+        index = []
+        arrays = {}
+        for (backend, engine), reports in self.reports.items():
+            for report, (labels, data) in reports.items():
+                arrays[f'data_{len(index)}'] = data
+                index.append({'backend': backend, 'engine': engine, 'report': report, 'labels': labels})
+        np.savez_compressed(path, index=np.array(json.dumps(index)), **arrays)
+
+    @classmethod
+    def load(cls, path, reference=None):
+        'read a store written by save'
+
+        store = cls(reference)
+        with np.load(path) as f:
+            for i, entry in enumerate(json.loads(str(f['index']))):
+                store.reports.setdefault((entry['backend'], entry['engine']), {})[entry['report']] = (entry['labels'], f[f'data_{i}'])
+        return store
+
+    def scores(self):
+        'see score_agreement'
+
+        return score_agreement(self.reports, self.reference)
+
+    def agreement_cells(self):
+        'results table cells of every run, as {backend: {engine: cell}}'
+
+        cells = {'remote': {}, 'local': {}}
+        for (backend, engine), score in self.scores().items():
+            cells.setdefault(backend, {})[engine] = agreement_cell(score)
+        return cells
+
+
+def parse_arguments():
+    "Parse command line arguments"
+
+    parser = argparse.ArgumentParser(
+        description="Score the agreement of each engine run's reports with the other engines"
+    )
+
+    parser.add_argument(
+        "store",
+        action="store",
+        type=str,
+        help="Reports store written by a test run, eg SBML/tests/reports.npz",
+    )
+
+    parser.add_argument(
+        "--reference",
+        action="store",
+        type=str,
+        default=None,
+        help="Engine the runs are compared with, defaults to the consensus of all the runs",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    store = ReportStore.load(args.store, reference=args.reference)
+    scores = store.scores()
+    if not scores:
+        print('(none)')
+    for (backend, engine), score in sorted(scores.items(), key=lambda item: item[0][::-1]):
+        print(f'{engine:<12} {backend:<7} {agreement_cell(score)}')